@@ -9,7 +9,7 @@ import os
 import sys
 import time
 from collections import deque
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 from llm_api.providers import get_provider, list_providers, list_enhanced_providers, check_provider_health
 from llm_api.providers.base import ProviderCapability
@@ -20,6 +20,9 @@ logger = logging.getLogger(__name__)
 class CogniQuantumCLIV2Fixed:
     def __init__(self):
         self.session_history = deque(maxlen=100)
+        # ウォームアップ済みの接続を再利用し、シャットダウン時にリソースを解放するため、
+        # 生成したプロバイダーを (プロバイダー名, 拡張版か) ごとに保持する
+        self._providers: Dict[Tuple[str, bool], Any] = {}
         
         # V2専用モード定義
         self.v2_modes = {
@@ -88,6 +91,29 @@ class CogniQuantumCLIV2Fixed:
             return {'server_available': False, 'error': f'An unexpected error occurred: {str(e)}'}
 
 
+    def _get_provider(self, provider_name: str, enhanced: bool) -> Any:
+        """プロバイダーを生成する。同一セッション内では生成済みのインスタンスを再利用する。"""
+        key = (provider_name, enhanced)
+        provider = self._providers.get(key)
+        if provider is None:
+            provider = self._providers[key] = get_provider(provider_name, enhanced=enhanced)
+        return provider
+
+    async def warmup(self, provider_name: str, **kwargs):
+        """
+        リクエストで最初に使用するプロバイダーを生成し、接続を事前に確立しておく。
+        V2モードではV2拡張プロバイダー、それ以外は標準プロバイダーのみを対象とし、フォールバック先は温めない。
+        生成やウォームアップに失敗しても、エラーは実際のリクエスト時に報告されるためここでは無視する。
+        """
+        use_v2 = kwargs.get('mode', 'simple') in self.v2_modes or kwargs.get('force_v2', False)
+        enhanced = use_v2 and not kwargs.get('no_fallback')
+        try:
+            provider = self._get_provider(provider_name, enhanced=enhanced)
+        except Exception as e:
+            logger.debug("ウォームアップ用のプロバイダー生成に失敗: %s", e)
+            return
+        await provider.warmup()
+
     async def process_request_with_fallback(self, provider_name: str, prompt: str, **kwargs) -> Dict[str, Any]:
         """
         フォールバック機能付きのリクエスト処理（V1ロジックを削除）
@@ -103,7 +129,7 @@ class CogniQuantumCLIV2Fixed:
         if use_v2 and not kwargs.get('no_fallback'):
             try:
                 logger.info(f"V2拡張プロバイダーを試行: {provider_name}")
-                provider = get_provider(provider_name, enhanced=True)
+                provider = self._get_provider(provider_name, enhanced=True)
                 
                 enhanced_kwargs = self._enhance_kwargs_v2(kwargs)
                 response = await provider.call(prompt, **enhanced_kwargs)
@@ -122,7 +148,7 @@ class CogniQuantumCLIV2Fixed:
         # 戦略2: 標準プロバイダーを試行
         try:
             logger.info(f"標準プロバイダーを試行: {provider_name}")
-            provider = get_provider(provider_name, enhanced=False)
+            provider = self._get_provider(provider_name, enhanced=False)
             
             standard_kwargs = self._convert_to_standard_kwargs(kwargs)
             response = await provider.call(prompt, **standard_kwargs)
@@ -152,6 +178,15 @@ class CogniQuantumCLIV2Fixed:
             'suggestions': self._generate_error_suggestions(provider_name, errors_encountered)
         }
 
+    async def aclose(self):
+        """このセッションで生成したプロバイダーのリソースを解放する。"""
+        while self._providers:
+            _, provider = self._providers.popitem()
+            try:
+                await provider.aclose()
+            except Exception as e:
+                logger.warning("プロバイダーのクローズ中にエラー: %s", e)
+
     def _enhance_kwargs_v2(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
         """V2用のkwargs拡張"""
         enhanced = kwargs.copy()
@@ -16,14 +16,16 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
-from llm_api.config import settings
+from llm_api.config import get_settings
 from cli.handler import CogniQuantumCLIV2Fixed
 from llm_api.providers import list_providers, list_enhanced_providers
 from llm_api.utils.helper_functions import format_json_output, read_from_pipe_or_file
+from llm_api.utils.http import close_client
 
 logger = logging.getLogger(__name__)
 
 async def main():
+    settings = get_settings()
     parser = argparse.ArgumentParser(
         description="CogniQuantum V2統合LLM CLI（設定管理改善版）",
         formatter_class=argparse.RawTextHelpFormatter
@@ -111,10 +113,9 @@ async def main():
         except Exception as e:
             print(f"健全性チェック中にエラー: {e}")
             return
-
-    prompt = await read_from_pipe_or_file(args.prompt, args.file)
-    if not prompt:
-        parser.error("プロンプトが指定されていません。")
+        finally:
+            await cli.aclose()
+            await close_client()
 
     # kwargsを構築
     kwargs = {k: v for k, v in vars(args).items() if v is not None}
@@ -124,7 +125,16 @@ async def main():
     kwargs.pop('provider', None)
     kwargs.pop('prompt', None)
 
+    # プロンプトの読み込みと並行して、最初に呼び出すプロバイダーの接続を温めておく
+    warmup_task = asyncio.create_task(cli.warmup(args.provider, **kwargs))
     try:
+        prompt = await read_from_pipe_or_file(args.prompt, args.file)
+        if not prompt:
+            warmup_task.cancel()
+            parser.error("プロンプトが指定されていません。")
+
+        await warmup_task
+
         response = await cli.process_request_with_fallback(
             args.provider, prompt, **kwargs
         )
@@ -180,6 +190,12 @@ async def main():
     except Exception as e:
         logger.critical(f"予期しない致命的エラー: {e}", exc_info=True)
         print(f"\n予期しない致命的なエラーが発生しました: {e}")
+    finally:
+        # 中断やエラーで取り残されたウォームアップを止めてから接続を閉じる
+        warmup_task.cancel()
+        await asyncio.gather(warmup_task, return_exceptions=True)
+        await cli.aclose()
+        await close_client()
 
 if __name__ == "__main__":
     if sys.platform == 'win32':
@@ -10,17 +10,25 @@ import logging
 import os
 
 # ロギング設定
+# フォーマッターは一度だけ生成し、全ハンドラーで共有する
+_LOG_FORMATTER = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%H:%M:%S'
+)
+
 def setup_logging():
     """ロギングの設定"""
     # 環境変数から直接ログレベルを取得（循環インポートを回避）
     log_level_str = os.getenv("LOG_LEVEL", "INFO").upper()
     log_level = getattr(logging, log_level_str, logging.INFO)
     
-    logging.basicConfig(
-        level=log_level,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    # basicConfigと同様、ルートロガーにハンドラーが未設定の場合のみ設定する（複数回呼ばれても重複しない）
+    root_logger = logging.getLogger()
+    if not root_logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(_LOG_FORMATTER)
+        root_logger.addHandler(handler)
+        root_logger.setLevel(log_level)
     
     # CogniQuantum特有のロガー
     cq_logger = logging.getLogger('cogniquantum')
@@ -32,5 +40,5 @@ setup_logging()
 # 設定オブジェクトは必要に応じて遅延インポート
 def get_settings():
     """設定オブジェクトを遅延インポートで取得"""
-    from llm_api.config import settings
-    return settings
\ No newline at end of file
+    from llm_api.config import get_settings as _get_settings
+    return _get_settings()
\ No newline at end of file
@@ -11,7 +11,7 @@ from typing import Any, Dict, List, Optional
 from .analyzer import AdaptiveComplexityAnalyzer
 from .enums import ComplexityRegime
 from ..providers.base import LLMProvider
-from ..config import settings
+from ..config import get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -185,7 +185,8 @@ class EnhancedReasoningEngine:
         """分解されたサブ問題を並列で解決する（同時実行数制限付き）"""
         logger.info(f"{len(sub_problems)}個のサブ問題を並列解決します。")
         
-        concurrency_limit = settings.OLLAMA_CONCURRENCY_LIMIT
+        # プロバイダー側(Ollama)は応答状況に応じて同時実行数を自動調整するため、ここでは上限のみを課す
+        concurrency_limit = get_settings().OLLAMA_CONCURRENCY_MAX
         semaphore = asyncio.Semaphore(concurrency_limit)
         logger.info(f"同時リクエスト数を{concurrency_limit}に制限します。")
 
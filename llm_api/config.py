@@ -2,6 +2,7 @@
 # タイトル: Centralized Settings Management (Complete Provider Support)
 # 役割: プロジェクト全体の設定を管理する。全プロバイダーのデフォルト設定を含む。
 
+from functools import lru_cache
 from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -27,10 +28,29 @@ class Settings(BaseSettings):
     OLLAMA_TIMEOUT: float = 1200.0
     OLLAMA_MAX_RETRIES: int = 3
     OLLAMA_BACKOFF_FACTOR: float = 2.0
+    # 同時リクエスト数は OLLAMA_CONCURRENCY_INITIAL から開始し、応答状況に応じて MAX まで自動調整される
+    OLLAMA_CONCURRENCY_INITIAL: int = 1
+    OLLAMA_CONCURRENCY_MAX: int = 4
+    OLLAMA_CONCURRENCY_LATENCY_MS: Optional[float] = None
+    # レート制限（1分あたりのリクエスト数/トークン数）。未設定の場合は制限しない
+    OLLAMA_RPM: Optional[int] = None
+    OLLAMA_TPM: Optional[int] = None
     
     # --- Llama.cpp Server Settings ---
     LLAMACPP_API_BASE_URL: Optional[str] = "http://localhost:8000"
     LLAMACPP_DEFAULT_MODEL_PATH: Optional[str] = "./models/Meta-Llama-3.1-8B-Instruct-Q4_K_M.gguf"
+    LLAMACPP_RPM: Optional[int] = None
+    LLAMACPP_TPM: Optional[int] = None
+
+    # --- HTTP Connection Pool ---
+    HTTPX_MAX_CONNECTIONS: int = 100
+    HTTPX_MAX_KEEPALIVE: int = 20
+    HTTPX_KEEPALIVE_EXPIRY: float = 30.0
+
+    # --- Response Cache ---
+    ENABLE_RESPONSE_CACHE: bool = False
+    RESPONSE_CACHE_MAXSIZE: int = 1024
+    RESPONSE_CACHE_TTL: float = 3600.0
 
     # --- Default Models ---
     OPENAI_DEFAULT_MODEL: str = "gpt-4o-mini"
@@ -47,4 +67,14 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = "INFO"
 
 
-settings = Settings()
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    設定オブジェクトを生成してキャッシュする。
+    環境変数を読み直したい場合（テストなど）は get_settings.cache_clear() を呼び出す。
+    """
+    return Settings()
+
+
+# 後方互換性のためのモジュールレベルの設定オブジェクト
+settings = get_settings()
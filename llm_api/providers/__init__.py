@@ -29,7 +29,7 @@ def _initialize_providers():
     # 標準プロバイダーのロード
     package_path = os.path.dirname(__file__)
     for _, name, _ in pkgutil.iter_modules([package_path]):
-        if name.startswith('enhanced_') or name == 'base':
+        if name.startswith(('enhanced_', '_')) or name == 'base':
             continue
         
         try:
@@ -41,9 +41,9 @@ def _initialize_providers():
                     not obj.__name__.startswith('Enhanced')):
                     provider_name = name.lower()
                     standard_providers[provider_name] = obj
-                    logger.debug(f"標準プロバイダー '{provider_name}' を登録: {obj.__name__}")
+                    logger.debug("標準プロバイダー '%s' を登録: %s", provider_name, obj.__name__)
         except Exception as e:
-            logger.warning(f"プロバイダーモジュール '{name}' のロードに失敗: {e}")
+            logger.warning("プロバイダーモジュール '%s' のロードに失敗: %s", name, e)
 
     # 拡張プロバイダーのロード (V2のみ)
     for _, name, _ in pkgutil.iter_modules([package_path]):
@@ -52,12 +52,12 @@ def _initialize_providers():
             if provider_name in standard_providers:
                 enhanced_providers["v2"].add(provider_name)
                 enhanced_providers["all"].add(provider_name)
-                logger.debug(f"V2拡張プロバイダー '{provider_name}' を発見")
+                logger.debug("V2拡張プロバイダー '%s' を発見", provider_name)
 
     _initialized = True
     logger.info("プロバイダーモジュール初期化完了")
-    logger.info(f"標準プロバイダー: {sorted(standard_providers.keys())}")
-    logger.info(f"拡張プロバイダー V2: {sorted(enhanced_providers['v2'])}")
+    logger.info("標準プロバイダー: %s", sorted(standard_providers.keys()))
+    logger.info("拡張プロバイダー V2: %s", sorted(enhanced_providers['v2']))
 
 
 def list_providers() -> List[str]:
@@ -78,13 +78,13 @@ def get_provider(name: str, enhanced: bool = False) -> LLMProvider:
     _initialize_providers()
     
     if enhanced:
-        logger.info(f"V2拡張プロバイダーを選択: {name}")
+        logger.info("V2拡張プロバイダーを選択: %s", name)
         provider_class = _get_enhanced_provider_class(name)
         # 拡張プロバイダーは標準プロバイダーを内部で利用する
         standard_provider = get_provider(name, enhanced=False)
         return provider_class(standard_provider)
     else:
-        logger.info(f"標準プロバイダーを選択: {name}")
+        logger.info("標準プロバイダーを選択: %s", name)
         provider_class = _get_standard_provider_class(name)
         return provider_class()
 
@@ -113,7 +113,7 @@ def _get_enhanced_provider_class(name: str):
         for class_name, obj in inspect.getmembers(module, inspect.isclass):
             # EnhancedLLMProviderのサブクラスで、ベースクラス自身ではないものを探す
             if issubclass(obj, EnhancedLLMProvider) and obj is not EnhancedLLMProvider:
-                logger.debug(f"動的探索によりクラス '{class_name}' を発見")
+                logger.debug("動的探索によりクラス '%s' を発見", class_name)
                 return obj # 発見したクラスを返す
         
         # ループを抜けてしまった場合（クラスが見つからない）
@@ -0,0 +1,74 @@
+# /llm_api/providers/_concurrency.py
+# タイトル: Adaptive Concurrency Limiter (AIMD)
+# 役割: サーバーの応答状況に応じて同時リクエスト数を加算増加・乗算減少で調整するセマフォを提供する。
+
+import asyncio
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+class AdaptiveSemaphore:
+    """
+    同時実行数の上限を動的に調整するセマフォ。
+    成功が続く間は上限を少しずつ引き上げ、5xxエラーやタイムアウトを検知すると半減させる（AIMD）。
+    """
+    def __init__(self, initial: int = 1, max_limit: int = 8, latency_threshold_ms: Optional[float] = None):
+        """
+        Args:
+            initial (int): 初期の同時実行上限。
+            max_limit (int): 同時実行上限の最大値。
+            latency_threshold_ms (Optional[float]): この値を超える応答は上限引き上げの根拠にしない。Noneの場合は判定しない。
+        """
+        self.max_limit = max(1, max_limit)
+        self.limit = min(max(1, initial), self.max_limit)
+        self.latency_threshold_ms = latency_threshold_ms
+        self._in_flight = 0
+        self._successes = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        """上限に空きができるまで待機してからスロットを確保する。"""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+
+    async def release(self):
+        """確保したスロットを解放する。"""
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.release()
+
+    def report(self, latency_ms: float, ok: bool):
+        """
+        リクエスト結果をフィードバックし、同時実行上限を更新する。
+        スロット解放前に呼び出すことで、解放時に待機タスクが新しい上限で再評価される。
+
+        Args:
+            latency_ms (float): リクエストの所要時間（ミリ秒）。
+            ok (bool): サーバーが正常に応答したかどうか。
+        """
+        if not ok:
+            new_limit = max(1, self.limit // 2)
+            if new_limit != self.limit:
+                logger.info("同時実行上限を縮小: %s -> %s", self.limit, new_limit)
+            self.limit = new_limit
+            self._successes = 0
+            return
+
+        if self.latency_threshold_ms is not None and latency_ms > self.latency_threshold_ms:
+            return
+
+        # 現在の上限分の成功が続くごとに上限を1つ引き上げる
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.max_limit:
+            self._successes = 0
+            self.limit += 1
+            logger.info("同時実行上限を拡大: %s -> %s", self.limit - 1, self.limit)
@@ -0,0 +1,86 @@
+# /llm_api/providers/_payloads.py
+# タイトル: Typed Request Payloads
+# 役割: Ollama / Llama.cpp へのリクエストペイロードを構築・エンコードする。msgspecが利用可能な場合は
+#       Struct型で構築して中間辞書を作らずにエンコードし、利用できない場合は辞書とorjsonにフォールバックする。
+
+from typing import Any, Dict, List, Optional, Union
+
+import orjson
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+if msgspec is not None:
+    class Message(msgspec.Struct):
+        role: str
+        content: str
+
+    class OllamaPayload(msgspec.Struct, omit_defaults=True):
+        """Ollama /api/chat 用のペイロード。未指定（None）のフィールドは送信しない。"""
+        model: str
+        messages: List[Message]
+        # Ollamaは未指定時にストリーミングするため、streamは常に送信する
+        stream: bool
+        options: Optional[Dict[str, Any]] = None
+        format: Optional[str] = None
+
+    class ChatCompletionPayload(msgspec.Struct, omit_defaults=True):
+        """OpenAI互換 /v1/chat/completions 用のペイロード。未指定（None）のフィールドは送信しない。"""
+        messages: List[Message]
+        temperature: float
+        max_tokens: int
+        stream: bool
+        top_p: Optional[float] = None
+        top_k: Optional[int] = None
+        repeat_penalty: Optional[float] = None
+        response_format: Optional[Dict[str, str]] = None
+
+    _encoder = msgspec.json.Encoder()
+
+Payload = Union[Dict[str, Any], "msgspec.Struct"]
+
+
+def make_message(role: str, content: str) -> Any:
+    """チャットメッセージを1件生成する。"""
+    if msgspec is None:
+        return {"role": role, "content": content}
+    return Message(role=role, content=content)
+
+
+def make_ollama_payload(model: str, messages: list, stream: bool,
+                        options: Optional[Dict[str, Any]] = None, format: Optional[str] = None) -> Payload:
+    """Ollama /api/chat 用のペイロードを生成する。"""
+    if msgspec is None:
+        payload: Dict[str, Any] = {"model": model, "messages": messages, "stream": stream}
+        if options:
+            payload["options"] = options
+        if format:
+            payload["format"] = format
+        return payload
+    return OllamaPayload(model=model, messages=messages, stream=stream, options=options or None, format=format)
+
+
+def make_chat_payload(messages: list, temperature: float, max_tokens: int, stream: bool = False, **extra: Any) -> Payload:
+    """
+    OpenAI互換チャット補完用のペイロードを生成する。
+    extraにはtop_p, top_k, repeat_penalty, response_formatを指定できる（Noneは送信しない）。
+    """
+    if msgspec is None:
+        payload: Dict[str, Any] = {
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": stream,
+        }
+        payload.update((key, value) for key, value in extra.items() if value is not None)
+        return payload
+    return ChatCompletionPayload(messages=messages, temperature=temperature, max_tokens=max_tokens, stream=stream, **extra)
+
+
+def encode_payload(payload: Payload) -> bytes:
+    """ペイロードをJSONバイト列にエンコードする。"""
+    if msgspec is not None and isinstance(payload, msgspec.Struct):
+        return _encoder.encode(payload)
+    return orjson.dumps(payload)
@@ -5,7 +5,10 @@
 import logging
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+
+from ..config import get_settings
+from ..utils.cache import AsyncTTLCache, make_cache_key
 
 # 循環参照を避けるため、型チェック時のみインポート
 from typing import TYPE_CHECKING
@@ -16,6 +19,16 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# プロバイダーインスタンスを跨いで共有する応答キャッシュ（初回利用時に生成）
+_response_cache: Optional[AsyncTTLCache] = None
+
+def _get_response_cache() -> AsyncTTLCache:
+    global _response_cache
+    if _response_cache is None:
+        settings = get_settings()
+        _response_cache = AsyncTTLCache(maxsize=settings.RESPONSE_CACHE_MAXSIZE, ttl=settings.RESPONSE_CACHE_TTL)
+    return _response_cache
+
 class ProviderCapability(Enum):
     """プロバイダーの機能を定義するEnum"""
     STANDARD_CALL = "standard_call"
@@ -58,14 +71,37 @@ class LLMProvider(ABC):
 
         if use_enhancement:
             if hasattr(self, 'enhanced_call') and callable(self.enhanced_call):
-                logger.debug(f"プロバイダー '{self.provider_name}' の enhanced_call を呼び出します。")
+                logger.debug("プロバイダー '%s' の enhanced_call を呼び出します。", self.provider_name)
                 enhanced_call_method = getattr(self, "enhanced_call")
                 return await enhanced_call_method(prompt, system_prompt, **kwargs)
             else:
-                 logger.warning(f"'{self.provider_name}' はENHANCED_CALLケイパビリティを持つと報告しましたが、enhanced_callメソッドが見つかりません。")
+                 logger.warning("'%s' はENHANCED_CALLケイパビリティを持つと報告しましたが、enhanced_callメソッドが見つかりません。", self.provider_name)
+
+        logger.debug("プロバイダー '%s' の standard_call を呼び出します。", self.provider_name)
+        return await self.cached_call(prompt, system_prompt, **kwargs)
+
+    async def cached_call(self, prompt: str, system_prompt: str = "", **kwargs) -> Dict[str, Any]:
+        """
+        応答キャッシュを介してstandard_callを呼び出す。
+        ENABLE_RESPONSE_CACHEが無効な場合は常にstandard_callを呼び出す。エラー応答はキャッシュしない。
+        """
+        settings = get_settings()
+        if not settings.ENABLE_RESPONSE_CACHE:
+            return await self.standard_call(prompt, system_prompt, **kwargs)
+
+        model = kwargs.get('model', getattr(self, 'default_model', None))
+        key = make_cache_key(self.provider_name, model, system_prompt, prompt, kwargs)
+        cache = _get_response_cache()
 
-        logger.debug(f"プロバイダー '{self.provider_name}' の standard_call を呼び出します。")
-        return await self.standard_call(prompt, system_prompt, **kwargs)
+        cached = await cache.get(key)
+        if cached is not None:
+            logger.debug("プロバイダー '%s' の応答をキャッシュから返します。", self.provider_name)
+            return cached
+
+        response = await self.standard_call(prompt, system_prompt, **kwargs)
+        if not response.get('error'):
+            await cache.set(key, response)
+        return response
 
     @abstractmethod
     async def standard_call(self, prompt: str, system_prompt: str = "", **kwargs) -> Dict[str, Any]:
@@ -82,6 +118,20 @@ class LLMProvider(ABC):
         """
         pass
 
+    async def warmup(self):
+        """
+        最初のリクエストの前にDNS解決や接続確立を済ませておく。
+        接続プールを持つ具象プロバイダーでオーバーライドする。失敗しても例外は送出しない。
+        """
+        pass
+
+    async def aclose(self):
+        """
+        プロバイダーが保持するリソース（HTTPクライアント等）を解放する。
+        解放すべきリソースを持つ具象プロバイダーでオーバーライドする。
+        """
+        pass
+
 class EnhancedLLMProvider(LLMProvider):
     """
     標準プロバイダーをラップし、CogniQuantum V2システムを介して追加機能を提供する拡張プロバイダーの基底クラス。
@@ -99,6 +149,14 @@ class EnhancedLLMProvider(LLMProvider):
         # ラップしているプロバイダーの名前に上書きする。
         self.provider_name = standard_provider.provider_name
 
+    async def warmup(self):
+        """ラップしている標準プロバイダーの接続を温める。"""
+        await self.standard_provider.warmup()
+
+    async def aclose(self):
+        """ラップしている標準プロバイダーのリソースを解放する。"""
+        await self.standard_provider.aclose()
+
     def _determine_force_regime(self, mode: str) -> 'ComplexityRegime' or None:
         """モード文字列から強制する複雑性レジームを決定する。"""
         # このインポートは実行時にのみ行われる
@@ -125,7 +183,7 @@ class EnhancedLLMProvider(LLMProvider):
 
         try:
             mode = kwargs.get('mode', 'adaptive')
-            logger.info(f"{self.provider_name} V2拡張呼び出し実行 (モード: {mode})")
+            logger.info("%s V2拡張呼び出し実行 (モード: %s)", self.provider_name, mode)
 
             force_regime = self._determine_force_regime(mode)
             base_model_kwargs = self._get_optimized_params(mode, kwargs)
@@ -150,7 +208,7 @@ class EnhancedLLMProvider(LLMProvider):
 
             if not result.get('success'):
                 error_message = result.get('error', f'CogniQuantumシステム({self.provider_name})で不明なエラーが発生しました。')
-                logger.error(f"CogniQuantumシステムがエラーを返しました: {error_message}")
+                logger.error("CogniQuantumシステムがエラーを返しました: %s", error_message)
                 return {"text": "", "error": error_message}
 
             paper_based_improvements = result.get('complexity_analysis', {})
@@ -166,5 +224,5 @@ class EnhancedLLMProvider(LLMProvider):
                 'paper_based_improvements': paper_based_improvements
             }
         except Exception as e:
-            logger.error(f"{self.provider_name} V2拡張プロバイダーで予期せぬエラー: {e}", exc_info=True)
+            logger.error("%s V2拡張プロバイダーで予期せぬエラー: %s", self.provider_name, e, exc_info=True)
             return {"text": "", "error": str(e)}
\ No newline at end of file
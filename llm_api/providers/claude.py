@@ -4,7 +4,7 @@ from typing import Any, Dict
 
 from anthropic import AsyncAnthropic
 from .base import LLMProvider, ProviderCapability
-from ..config import settings
+from ..config import get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +13,7 @@ class ClaudeProvider(LLMProvider):
     Anthropic Claude APIと対話するための標準プロバイダー
     """
     def __init__(self):
+        settings = get_settings()
         self.client = AsyncAnthropic(api_key=settings.CLAUDE_API_KEY)
         self.default_model = settings.CLAUDE_DEFAULT_MODEL
         super().__init__()
@@ -58,5 +59,5 @@ class ClaudeProvider(LLMProvider):
                 "error": None,
             }
         except Exception as e:
-            logger.error(f"Claude API呼び出し中にエラー: {e}", exc_info=True)
+            logger.error("Claude API呼び出し中にエラー: %s", e, exc_info=True)
             return {"text": "", "error": str(e)}
\ No newline at end of file
@@ -29,6 +29,6 @@ class EnhancedClaudeProviderV2(EnhancedLLMProvider):
 
     def get_capabilities(self) -> Dict[ProviderCapability, bool]:
         # 標準プロバイダーの能力を継承しつつ、拡張呼び出しを有効化
-        capabilities = self.standard_provider.get_capabilities()
+        capabilities = dict(self.standard_provider.get_capabilities())
         capabilities[ProviderCapability.ENHANCED_CALL] = True
         return capabilities
\ No newline at end of file
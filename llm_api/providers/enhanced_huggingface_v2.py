@@ -24,6 +24,6 @@ class EnhancedHuggingFaceProviderV2(EnhancedLLMProvider):
         return params
 
     def get_capabilities(self) -> Dict[ProviderCapability, bool]:
-        capabilities = self.standard_provider.get_capabilities()
+        capabilities = dict(self.standard_provider.get_capabilities())
         capabilities[ProviderCapability.ENHANCED_CALL] = True
         return capabilities
\ No newline at end of file
@@ -27,13 +27,13 @@ class EnhancedOllamaProviderV2(EnhancedLLMProvider):
 
         if mode == 'edge' and not model_name:
             effective_model_name = 'gemma:2b'
-            logger.info(f"エッジモードのため、デフォルトの軽量モデル '{effective_model_name}' を選択しました。")
+            logger.info("エッジモードのため、デフォルトの軽量モデル '%s' を選択しました。", effective_model_name)
         else:
             # ユーザー環境に存在する可能性が高い gemma3:latest をデフォルトにする
             effective_model_name = model_name or 'gemma3:latest'
 
         family = get_model_family(effective_model_name)
-        logger.info(f"モデル '{effective_model_name}' (ファミリー: {family}) のパラメータを最適化中")
+        logger.info("モデル '%s' (ファミリー: %s) のパラメータを最適化中", effective_model_name, family)
 
         if 'model' not in params:
             params['model'] = effective_model_name
@@ -50,6 +50,6 @@ class EnhancedOllamaProviderV2(EnhancedLLMProvider):
         return params
 
     def get_capabilities(self) -> Dict[ProviderCapability, bool]:
-        capabilities = self.standard_provider.get_capabilities()
+        capabilities = dict(self.standard_provider.get_capabilities())
         capabilities[ProviderCapability.ENHANCED_CALL] = True
         return capabilities
\ No newline at end of file
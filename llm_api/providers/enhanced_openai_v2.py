@@ -5,7 +5,7 @@
 from typing import Any, Dict
 
 from .base import EnhancedLLMProvider, ProviderCapability
-from ..config import settings
+from ..config import get_settings
 
 class EnhancedOpenAIProviderV2(EnhancedLLMProvider):
     async def standard_call(self, prompt: str, system_prompt: str = "", **kwargs) -> Dict[str, Any]:
@@ -19,12 +19,13 @@ class EnhancedOpenAIProviderV2(EnhancedLLMProvider):
 
     def _get_optimized_params(self, mode: str, kwargs: Dict) -> Dict:
         """OpenAIに最適化されたモデルパラメータを返す。"""
+        settings = get_settings()
         params = kwargs.copy()
         if 'model' not in params:
             params['model'] = settings.OPENAI_DEFAULT_MODEL
         return params
 
     def get_capabilities(self) -> Dict[ProviderCapability, bool]:
-        capabilities = self.standard_provider.get_capabilities()
+        capabilities = dict(self.standard_provider.get_capabilities())
         capabilities[ProviderCapability.ENHANCED_CALL] = True
         return capabilities
\ No newline at end of file
@@ -4,7 +4,7 @@ from typing import Any, Dict
 
 import google.generativeai as genai
 from .base import LLMProvider, ProviderCapability
-from ..config import settings
+from ..config import get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +13,7 @@ class GeminiProvider(LLMProvider):
     Google Gemini APIと対話するための標準プロバイダー
     """
     def __init__(self):
+        settings = get_settings()
         api_key = settings.GEMINI_API_KEY
         if not api_key:
             raise ValueError("GEMINI_API_KEYが設定されていません。")
@@ -44,7 +45,10 @@ class GeminiProvider(LLMProvider):
             
             full_prompt = f"{system_prompt}\n\n{prompt}" if system_prompt else prompt
 
-            response = await model.generate_content_async(full_prompt)
+            # JSONモードが要求された場合は、応答のMIMEタイプをJSONに制約する
+            generation_config = {"response_mime_type": "application/json"} if kwargs.get("json_mode") else None
+
+            response = await model.generate_content_async(full_prompt, generation_config=generation_config)
             
             return {
                 "text": response.text.strip(),
@@ -53,5 +57,5 @@ class GeminiProvider(LLMProvider):
                 "error": None,
             }
         except Exception as e:
-            logger.error(f"Gemini API呼び出し中にエラー: {e}", exc_info=True)
+            logger.error("Gemini API呼び出し中にエラー: %s", e, exc_info=True)
             return {"text": "", "error": str(e)}
\ No newline at end of file
@@ -4,7 +4,7 @@ from typing import Any, Dict
 
 from huggingface_hub import AsyncInferenceClient
 from .base import LLMProvider, ProviderCapability
-from ..config import settings
+from ..config import get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +13,7 @@ class HuggingFaceProvider(LLMProvider):
     Hugging Face Inference APIと対話するための標準プロバイダー
     """
     def __init__(self):
+        settings = get_settings()
         self.client = AsyncInferenceClient(token=settings.HF_TOKEN)
         self.default_model = settings.HUGGINGFACE_DEFAULT_MODEL
         super().__init__()
@@ -56,5 +57,5 @@ class HuggingFaceProvider(LLMProvider):
                 "error": None,
             }
         except Exception as e:
-            logger.error(f"Hugging Face API呼び出し中にエラー: {e}", exc_info=True)
+            logger.error("Hugging Face API呼び出し中にエラー: %s", e, exc_info=True)
             return {"text": "", "error": str(e)}
\ No newline at end of file
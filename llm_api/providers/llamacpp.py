@@ -3,38 +3,49 @@
 # 役割: llama-cpp-pythonのOpenAI互換サーバーと直接対話するための標準プロバイダー。
 
 import logging
-from typing import Any, Dict
+from types import MappingProxyType
+from typing import Any, ClassVar, Dict, Mapping
 
 import httpx
+import orjson
+from ._payloads import Payload, encode_payload, make_chat_payload, make_message
 from .base import LLMProvider, ProviderCapability
-from ..config import settings
+from ..config import get_settings
+from ..utils.http import get_client
+from ..utils.ratelimit import call_with_rate_limit, estimate_tokens, get_bucket
 
 logger = logging.getLogger(__name__)
 
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
 class LlamaCppProvider(LLMProvider):
     """
     llama-cpp-pythonのOpenAI互換サーバーと対話するための標準プロバイダー
     """
+    _CAPABILITIES: ClassVar[Mapping[ProviderCapability, bool]] = MappingProxyType({
+        ProviderCapability.STANDARD_CALL: True,
+        ProviderCapability.ENHANCED_CALL: False,
+        ProviderCapability.STREAMING: True,
+        ProviderCapability.SYSTEM_PROMPT: True,
+        ProviderCapability.TOOLS: False,
+        ProviderCapability.JSON_MODE: True,
+    })
+
     def __init__(self):
+        settings = get_settings()
         if not settings.LLAMACPP_API_BASE_URL:
             raise ValueError("LLAMACPP_API_BASE_URLが.envファイルに設定されていません。")
         
-        self.api_url = f"{settings.LLAMACPP_API_BASE_URL.rstrip('/')}/v1/chat/completions"
+        self.api_base_url = settings.LLAMACPP_API_BASE_URL.rstrip('/')
+        self.api_url = f"{self.api_base_url}/v1/chat/completions"
         self.default_model = settings.LLAMACPP_DEFAULT_MODEL_PATH or "llama-model"
-        self.client = httpx.AsyncClient(timeout=600.0)
+        self.timeout = 600.0
         super().__init__()
-        logger.info(f"LlamaCpp provider initialized with API URL: {self.api_url}")
+        logger.info("LlamaCpp provider initialized with API URL: %s", self.api_url)
 
-    def get_capabilities(self) -> Dict[ProviderCapability, bool]:
-        """このプロバイダーのケイパビリティを返す。"""
-        return {
-            ProviderCapability.STANDARD_CALL: True,
-            ProviderCapability.ENHANCED_CALL: False,
-            ProviderCapability.STREAMING: True,
-            ProviderCapability.SYSTEM_PROMPT: True,
-            ProviderCapability.TOOLS: False,
-            ProviderCapability.JSON_MODE: True,
-        }
+    def get_capabilities(self) -> Mapping[ProviderCapability, bool]:
+        """このプロバイダーのケイパビリティを返す（読み取り専用の共有マッピング）。"""
+        return self._CAPABILITIES
 
     def should_use_enhancement(self, prompt: str, **kwargs) -> bool:
         """標準プロバイダーは拡張機能を使用しない。"""
@@ -42,28 +53,33 @@ class LlamaCppProvider(LLMProvider):
         
     async def standard_call(self, prompt: str, system_prompt: str = "", **kwargs) -> Dict[str, Any]:
         """Llama.cppサーバーを呼び出し、標準化された辞書形式で結果を返す。"""
+        settings = get_settings()
         messages = []
         if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        messages.append({"role": "user", "content": prompt})
+            messages.append(make_message("system", system_prompt))
+        messages.append(make_message("user", prompt))
 
         # llama-cpp-pythonサーバーはmodel引数を必要としない場合が多い
-        payload = {
-            "messages": messages,
-            "temperature": kwargs.get("temperature", 0.7),
-            "max_tokens": kwargs.get("max_tokens", 4096),
-            "stream": False,
-        }
-
-        # top_pやtop_kがあれば追加
-        for param in ['top_p', 'top_k', 'repeat_penalty']:
-            if param in kwargs:
-                payload[param] = kwargs[param]
+        payload = make_chat_payload(
+            messages=messages,
+            temperature=kwargs.get("temperature", 0.7),
+            max_tokens=kwargs.get("max_tokens", 4096),
+            stream=False,
+            # top_pやtop_kがあれば追加
+            top_p=kwargs.get('top_p'),
+            top_k=kwargs.get('top_k'),
+            repeat_penalty=kwargs.get('repeat_penalty'),
+            # JSONモードをサポート
+            response_format={"type": "json_object"} if kwargs.get('json_mode') else None
+        )
 
         try:
-            response = await self.client.post(self.api_url, json=payload)
-            response.raise_for_status()
-            response_data = response.json()
+            bucket = get_bucket(self.provider_name, self.default_model, settings.LLAMACPP_RPM, settings.LLAMACPP_TPM)
+            response_data = await call_with_rate_limit(
+                bucket,
+                estimate_tokens(prompt, system_prompt),
+                lambda: self._post(payload)
+            )
             
             content = response_data["choices"][0]["message"]["content"]
             usage = response_data.get("usage", {})
@@ -96,8 +112,23 @@ class LlamaCppProvider(LLMProvider):
             logger.error(error_msg, exc_info=True)
             return {"text": "", "error": error_msg}
             
+    async def _post(self, payload: Payload) -> Dict[str, Any]:
+        """チャット補完エンドポイントにPOSTし、デコード済みの応答を返す。2xx以外は例外を送出する。"""
+        client = await get_client()
+        response = await client.post(self.api_url, content=encode_payload(payload), headers=_JSON_HEADERS, timeout=self.timeout)
+        response.raise_for_status()
+        return orjson.loads(response.content)
+
+    async def warmup(self):
+        """/v1/modelsへ軽量なリクエストを送り、接続プールを事前に確立する。"""
+        try:
+            client = await get_client()
+            await client.get(f"{self.api_base_url}/v1/models", timeout=2.0)
+        except Exception as e:
+            logger.debug("Llama.cppのウォームアップに失敗しました: %s", e)
+
     async def __aenter__(self):
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.client.aclose()
\ No newline at end of file
+        await self.aclose()
\ No newline at end of file
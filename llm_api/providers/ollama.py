@@ -4,54 +4,60 @@
 
 import logging
 import asyncio  # 修正: asyncioをインポート
-from typing import Any, Dict
+import time
+from contextlib import aclosing
+from types import MappingProxyType
+from typing import Any, AsyncIterator, ClassVar, Dict, Mapping
 
 import httpx
+import orjson
+from ._concurrency import AdaptiveSemaphore
+from ._payloads import Payload, encode_payload, make_message, make_ollama_payload
 from .base import LLMProvider, ProviderCapability
-from ..config import settings
+from ..config import get_settings
+from ..utils.http import get_client
+from ..utils.ratelimit import call_with_rate_limit, estimate_tokens, get_bucket
 
 logger = logging.getLogger(__name__)
 
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
 class OllamaProvider(LLMProvider):
     """
     Ollamaと対話するための標準プロバイダー
     """
+    _CAPABILITIES: ClassVar[Mapping[ProviderCapability, bool]] = MappingProxyType({
+        ProviderCapability.STANDARD_CALL: True,
+        ProviderCapability.ENHANCED_CALL: False,
+        ProviderCapability.STREAMING: True,
+        ProviderCapability.SYSTEM_PROMPT: True,
+        ProviderCapability.TOOLS: False,
+        ProviderCapability.JSON_MODE: True,
+    })
+
     def __init__(self):
+        settings = get_settings()
         self.api_base_url = settings.OLLAMA_API_BASE_URL
         self.default_model = settings.OLLAMA_DEFAULT_MODEL
         self.timeout = settings.OLLAMA_TIMEOUT
+        self.sem = AdaptiveSemaphore(
+            initial=settings.OLLAMA_CONCURRENCY_INITIAL,
+            max_limit=settings.OLLAMA_CONCURRENCY_MAX,
+            latency_threshold_ms=settings.OLLAMA_CONCURRENCY_LATENCY_MS
+        )
         super().__init__()
-        logger.info(f"Ollama provider initialized with API URL: {self.api_base_url} and default model: {self.default_model}")
-
-    def get_capabilities(self) -> Dict[ProviderCapability, bool]:
-        """このプロバイダーのケイパビリティを返す。"""
-        return {
-            ProviderCapability.STANDARD_CALL: True,
-            ProviderCapability.ENHANCED_CALL: False,
-            ProviderCapability.STREAMING: False,
-            ProviderCapability.SYSTEM_PROMPT: True,
-            ProviderCapability.TOOLS: False,
-            ProviderCapability.JSON_MODE: True,
-        }
+        logger.info("Ollama provider initialized with API URL: %s and default model: %s", self.api_base_url, self.default_model)
 
-    async def standard_call(self, prompt: str, system_prompt: str = "", **kwargs) -> Dict[str, Any]:
-        """
-        Ollama APIを呼び出し、標準化された辞書形式で結果を返す。
-        リトライ可能なエラーが発生した場合は、呼び出し元で処理できるよう例外を送出する。
-        """
-        api_url = f"{self.api_base_url}/api/chat"
-        model = kwargs.get("model", self.default_model)
+    def get_capabilities(self) -> Mapping[ProviderCapability, bool]:
+        """このプロバイダーのケイパビリティを返す（読み取り専用の共有マッピング）。"""
+        return self._CAPABILITIES
 
+    def _build_payload(self, prompt: str, system_prompt: str, stream: bool, **kwargs) -> Payload:
+        """Ollama /api/chat 用のリクエストペイロードを構築する。"""
         messages = []
         if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        messages.append({"role": "user", "content": prompt})
-
-        payload = {
-            "model": model,
-            "messages": messages,
-            "stream": False,
-        }
+            messages.append(make_message("system", system_prompt))
+        messages.append(make_message("user", prompt))
 
         # 改善: temperatureなどのパラメータをoptionsにネスト
         options = {}
@@ -63,39 +69,104 @@ class OllamaProvider(LLMProvider):
         for key in supported_options:
             if key in kwargs:
                 options[key] = kwargs[key]
-        if options:
-            payload['options'] = options
-        
+
         # 改善: JSONモードをサポート
-        if kwargs.get('json_mode'):
-            payload['format'] = 'json'
+        return make_ollama_payload(
+            model=kwargs.get("model", self.default_model),
+            messages=messages,
+            stream=stream,
+            options=options,
+            format='json' if kwargs.get('json_mode') else None
+        )
+
+    async def stream_call(self, prompt: str, system_prompt: str = "", **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Ollama APIをストリーミングモードで呼び出し、NDJSONの各チャンクを到着順に返す。
+        2xx以外のステータスやタイムアウトは例外として送出する。
+        """
+        api_url = f"{self.api_base_url}/api/chat"
+        payload = self._build_payload(prompt, system_prompt, stream=True, **kwargs)
+
+        async with self.sem:
+            # 全プロバイダーで共有するクライアントを使い、タイムアウトはリクエスト毎に指定する
+            client = await get_client()
+            start_time = time.monotonic()
+            try:
+                async with client.stream("POST", api_url, content=encode_payload(payload), headers=_JSON_HEADERS, timeout=self.timeout) as response:
+                    if response.is_error:
+                        # サーバー過負荷の兆候 (5xx/429) があれば同時実行上限を縮小する。
+                        # その他の4xxはリクエスト側の誤りで負荷とは無関係なため、成功としても数えない
+                        if response.status_code >= 500 or response.status_code == 429:
+                            self.sem.report((time.monotonic() - start_time) * 1000, ok=False)
+                        # 呼び出し元がエラー本文を参照できるよう読み込んでから送出する
+                        await response.aread()
+                        response.raise_for_status()
+
+                    async for line in response.aiter_lines():
+                        if line:
+                            yield orjson.loads(line)
+            except httpx.TimeoutException:
+                self.sem.report((time.monotonic() - start_time) * 1000, ok=False)
+                raise
+            else:
+                self.sem.report((time.monotonic() - start_time) * 1000, ok=True)
+
+    async def _consume_stream(self, prompt: str, system_prompt: str, **kwargs) -> Dict[str, Any]:
+        """stream_callを最後まで消費し、標準化された応答辞書を組み立てる。"""
+        model = kwargs.get("model", self.default_model)
+        content_parts = []
+        final_chunk: Dict[str, Any] = {}
+        stream_error = None
+        async with aclosing(self.stream_call(prompt, system_prompt, **kwargs)) as chunks:
+            async for chunk in chunks:
+                if chunk.get('error'):
+                    stream_error = chunk['error']
+                    break
+                content_parts.append(chunk.get('message', {}).get('content', ''))
+                if chunk.get('done'):
+                    final_chunk = chunk
+
+        if stream_error:
+            error_msg = f"Ollama APIがエラーを返しました: {stream_error}"
+            logger.error(error_msg)
+            return {"text": "", "model": model, "usage": {}, "error": error_msg}
+
+        full_response = ''.join(content_parts)
+        
+        # Nullチェックを追加してトークン数を安全に計算
+        prompt_tokens = final_chunk.get("prompt_eval_count") or 0
+        completion_tokens = final_chunk.get("eval_count") or 0
+
+        return {
+            "text": full_response,
+            "model": model,
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            },
+            "error": None
+        }
+
+    async def standard_call(self, prompt: str, system_prompt: str = "", **kwargs) -> Dict[str, Any]:
+        """
+        Ollama APIを呼び出し、標準化された辞書形式で結果を返す。
+        内部ではstream_callを消費して応答を組み立てる。
+        リトライ可能なエラーが発生した場合は、呼び出し元で処理できるよう例外を送出する。
+        """
+        model = kwargs.get("model", self.default_model)
+        settings = get_settings()
 
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(api_url, json=payload)
-                # 修正: 2xx以外のステータスコードで例外を送出
-                response.raise_for_status()
-                response_data = response.json()
-
-            full_response = response_data.get('message', {}).get('content', '')
-            
-            # Nullチェックを追加してトークン数を安全に計算
-            prompt_tokens = response_data.get("prompt_eval_count") or 0
-            completion_tokens = response_data.get("eval_count") or 0
-
-            return {
-                "text": full_response,
-                "model": model,
-                "usage": {
-                    "prompt_tokens": prompt_tokens,
-                    "completion_tokens": completion_tokens,
-                    "total_tokens": prompt_tokens + completion_tokens
-                },
-                "error": None
-            }
+            bucket = get_bucket(self.provider_name, model, settings.OLLAMA_RPM, settings.OLLAMA_TPM)
+            return await call_with_rate_limit(
+                bucket,
+                estimate_tokens(prompt, system_prompt),
+                lambda: self._consume_stream(prompt, system_prompt, **kwargs)
+            )
         except (httpx.HTTPStatusError, httpx.RequestError) as e:
             # 修正: リトライ可能なエラーはそのまま送出する
-            logger.warning(f"Ollama API call failed, propagating exception: {e}")
+            logger.warning("Ollama API call failed, propagating exception: %s", e)
             raise
         except Exception as e:
             # 修正: 予期せぬエラーは捕捉し、エラー辞書を返す
@@ -109,6 +180,7 @@ class OllamaProvider(LLMProvider):
         リトライロジックを実装したstandard_callのラッパー。
         5xxエラーや接続エラーが発生した場合に指数関数的バックオフでリトライする。
         """
+        settings = get_settings()
         last_exception = None
         model = kwargs.get("model", self.default_model)
 
@@ -122,8 +194,8 @@ class OllamaProvider(LLMProvider):
                 if 500 <= e.response.status_code < 600 and attempt < settings.OLLAMA_MAX_RETRIES - 1:
                     wait_time = settings.OLLAMA_BACKOFF_FACTOR ** attempt
                     logger.warning(
-                        f"Ollama API returned status {e.response.status_code}. Retrying in {wait_time:.2f}s... "
-                        f"(Attempt {attempt + 1}/{settings.OLLAMA_MAX_RETRIES})"
+                        "Ollama API returned status %s. Retrying in %.2fs... (Attempt %d/%d)",
+                        e.response.status_code, wait_time, attempt + 1, settings.OLLAMA_MAX_RETRIES
                     )
                     await asyncio.sleep(wait_time)
                 else:
@@ -136,8 +208,8 @@ class OllamaProvider(LLMProvider):
                 if attempt < settings.OLLAMA_MAX_RETRIES - 1:
                     wait_time = settings.OLLAMA_BACKOFF_FACTOR ** attempt
                     logger.warning(
-                        f"Ollama API request failed: {e}. Retrying in {wait_time:.2f}s... "
-                        f"(Attempt {attempt + 1}/{settings.OLLAMA_MAX_RETRIES})"
+                        "Ollama API request failed: %s. Retrying in %.2fs... (Attempt %d/%d)",
+                        e, wait_time, attempt + 1, settings.OLLAMA_MAX_RETRIES
                     )
                     await asyncio.sleep(wait_time)
                 else:
@@ -152,4 +224,12 @@ class OllamaProvider(LLMProvider):
 
     def should_use_enhancement(self, prompt: str, **kwargs) -> bool:
         """標準プロバイダーは拡張機能を使用しない。"""
-        return False
\ No newline at end of file
+        return False
+
+    async def warmup(self):
+        """/api/tagsへ軽量なリクエストを送り、接続プールを事前に確立する。"""
+        try:
+            client = await get_client()
+            await client.get(f"{self.api_base_url}/api/tags", timeout=2.0)
+        except Exception as e:
+            logger.debug("Ollamaのウォームアップに失敗しました: %s", e)
\ No newline at end of file
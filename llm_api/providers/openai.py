@@ -4,7 +4,7 @@ from typing import Any, Dict
 
 from openai import AsyncOpenAI
 from .base import LLMProvider, ProviderCapability
-from ..config import settings
+from ..config import get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +13,7 @@ class OpenAIProvider(LLMProvider):
     OpenAI APIと対話するための標準プロバイダー
     """
     def __init__(self):
+        settings = get_settings()
         self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
         self.default_model = settings.OPENAI_DEFAULT_MODEL
         super().__init__()
@@ -40,6 +41,8 @@ class OpenAIProvider(LLMProvider):
         messages.append({"role": "user", "content": prompt})
 
         model_to_use = kwargs.get("model", self.default_model)
+        # JSONモードが要求された場合は、応答をJSONオブジェクトに制約する
+        extra_params = {"response_format": {"type": "json_object"}} if kwargs.get("json_mode") else {}
 
         try:
             response = await self.client.chat.completions.create(
@@ -47,6 +50,7 @@ class OpenAIProvider(LLMProvider):
                 messages=messages,
                 temperature=kwargs.get("temperature", 0.7),
                 max_tokens=kwargs.get("max_tokens", 1024),
+                **extra_params
             )
             
             content = response.choices[0].message.content
@@ -63,5 +67,5 @@ class OpenAIProvider(LLMProvider):
                 "error": None,
             }
         except Exception as e:
-            logger.error(f"OpenAI API呼び出し中にエラー: {e}", exc_info=True)
+            logger.error("OpenAI API呼び出し中にエラー: %s", e, exc_info=True)
             return {"text": "", "error": str(e)}
\ No newline at end of file
@@ -0,0 +1,78 @@
+# /llm_api/rag/_wiki.py
+# タイトル: Async Wikipedia Fetcher
+# 役割: Wikipedia APIを非同期に呼び出し、検索上位ページの本文を並列に取得する。
+
+import asyncio
+import logging
+from typing import List
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+_HEADERS = {"User-Agent": "CogniQuantum/2.1 (https://github.com/littlebuddha-dev/Cogni-Quantum3)"}
+
+
+def _api_url(lang: str) -> str:
+    return f"https://{lang}.wikipedia.org/w/api.php"
+
+
+async def _fetch_extract(client: httpx.AsyncClient, title: str, lang: str, chars: int, timeout: float) -> str:
+    """指定タイトルのページ本文をプレーンテキストで取得する。"""
+    params = {
+        "action": "query",
+        "prop": "extracts",
+        "explaintext": 1,
+        "redirects": 1,
+        "titles": title,
+        "format": "json",
+    }
+    response = await client.get(_api_url(lang), params=params, headers=_HEADERS, timeout=timeout)
+    response.raise_for_status()
+    pages = response.json().get("query", {}).get("pages", {})
+    for page in pages.values():
+        extract = page.get("extract")
+        if extract:
+            return extract[:chars]
+    return ""
+
+
+async def fetch_wikipedia(client: httpx.AsyncClient, query: str, lang: str = "ja", max_docs: int = 2, chars: int = 2000, timeout: float = 10.0) -> List[str]:
+    """
+    クエリでWikipediaを検索し、上位ページの本文を並列に取得する。
+
+    Args:
+        client (httpx.AsyncClient): リクエストに使用するクライアント。
+        query (str): 検索クエリ。
+        lang (str): Wikipediaの言語コード。
+        max_docs (int): 取得するページ数の上限。
+        chars (int): 各ページ本文の最大文字数。
+        timeout (float): 各リクエストのタイムアウト（秒）。
+
+    Returns:
+        List[str]: 取得できたページ本文のリスト。
+    """
+    params = {
+        "action": "query",
+        "list": "search",
+        "srsearch": query,
+        "srlimit": max_docs,
+        "format": "json",
+    }
+    response = await client.get(_api_url(lang), params=params, headers=_HEADERS, timeout=timeout)
+    response.raise_for_status()
+    titles = [hit["title"] for hit in response.json().get("query", {}).get("search", [])]
+    if not titles:
+        return []
+
+    results = await asyncio.gather(
+        *(_fetch_extract(client, title, lang, chars, timeout) for title in titles),
+        return_exceptions=True
+    )
+    texts = []
+    for title, result in zip(titles, results):
+        if isinstance(result, Exception):
+            logger.warning("Wikipediaページ '%s' の取得に失敗: %s", title, result)
+        elif result:
+            texts.append(result)
+    return texts
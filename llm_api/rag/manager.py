@@ -2,29 +2,106 @@
 # タイトル: RAG Manager with Robust Query Extraction
 # 役割: RAGプロセスを管理する。LLMから検索クエリを抽出するプロンプトを強化し、出力のサニタイズ処理を追加する。
 
+import asyncio
+import functools
+import json
 import logging
+import os
 import re # reモジュールをインポート
-from typing import Optional
+from typing import Any, Dict, Optional
 
+import httpx
+
+from ._wiki import fetch_wikipedia
 from .knowledge_base import KnowledgeBase
 from .retriever import Retriever
-from langchain_community.document_loaders import WikipediaLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from ..providers.base import LLMProvider
+from ..providers.base import LLMProvider, ProviderCapability
+from ..utils.http import get_client
 
 logger = logging.getLogger(__name__)
 
+# 漢字・カタカナの連なりや、大文字で始まる英単語（日本語に隣接する場合も含む）を固有名詞の候補とみなす
+_PROPER_NOUN_RE = re.compile(
+    r"[\u4E00-\u9FFF\u30A1-\u30FA\u30FC]{2,}"
+    r"|(?<![A-Za-z0-9])[A-Z][A-Za-z0-9.+\-]*[A-Za-z0-9+]"
+)
+# 文頭で大文字になるだけの英単語や、検索の手掛かりにならない漢語
+_HEURISTIC_STOPWORDS = frozenset({
+    'What', 'How', 'Why', 'When', 'Where', 'Who', 'Which', 'Is', 'Are',
+    'Do', 'Does', 'Can', 'Could', 'The', 'An', 'Please', 'Tell', 'Explain',
+    'Describe', 'Compare', 'Summarize', 'Give', 'List', 'Show', 'Write', 'Define',
+    'In', 'On', 'At', 'For', 'From', 'With', 'About', 'After', 'Before', 'If',
+    'This', 'That', 'These', 'Those', 'There', 'It', 'My', 'Our', 'Your',
+    'Should', 'Would', 'Will', 'Was', 'Were', 'Has', 'Have', 'Did', 'And', 'But', 'Or',
+    '説明', '方法', '理由', '意味', '特徴', '比較', '最新', '簡単', '簡潔', '詳細', '具体的',
+})
+
+def _heuristic_query(prompt: str, max_terms: int = 3) -> str:
+    """LLMを使わずにプロンプトから固有名詞らしい語を抜き出し、簡易的な検索クエリを作る。"""
+    terms = []
+    for match in _PROPER_NOUN_RE.findall(prompt):
+        if match in _HEURISTIC_STOPWORDS or match in terms:
+            continue
+        terms.append(match)
+        if len(terms) >= max_terms:
+            break
+    return " ".join(terms)
+
+_AUGMENTED_PROMPT_TEMPLATE = """以下の「コンテキスト情報」を最優先の根拠として利用し、「元の質問」に答えてください。
+
+# コンテキスト情報
+---
+{context}
+---
+
+# 元の質問
+{question}
+"""
+
+def _sanitize_query(query: str) -> str:
+    """LLMが返した検索クエリから余計な接頭辞やクォーテーションを取り除く。"""
+    # 万が一、LLMが余計なテキストを返した場合に備えて後処理を追加
+    # 「出力：」や「検索キーワード：」のような接頭辞を削除
+    query = re.sub(r'^(出力|検索キーワード)[:：\s]*', '', query).strip()
+    # クォーテーションを削除
+    return query.replace("「", "").replace("」", "").replace("\"", "").replace("'", "")
+
+def _parse_bool(value: Any, default: bool) -> bool:
+    """JSONの真偽値を厳密に解釈する。文字列は大文字小文字を区別せず"true"のみを真とし、それ以外の型は既定値とする。"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        return value.strip().lower() == "true"
+    return default
+
+def _normalize_query(query: str) -> frozenset:
+    return frozenset(query.lower().split())
+
+@functools.lru_cache(maxsize=8)
+def _load_kb(path: str, mtime: Optional[float]) -> KnowledgeBase:
+    """
+    ナレッジベースを構築してキャッシュする。
+    mtimeをキーに含めることで、ファイルが更新された場合は再構築される。
+    """
+    kb = KnowledgeBase()
+    kb.load_documents(path)
+    return kb
+
 class RAGManager:
     """RAGプロセスを管理するクラス"""
     def __init__(self,
                  provider: LLMProvider,
                  use_wikipedia: bool = False,
-                 knowledge_base_path: Optional[str] = None):
+                 knowledge_base_path: Optional[str] = None,
+                 client: Optional[httpx.AsyncClient] = None):
         
         self.provider = provider
         self.use_wikipedia = use_wikipedia
         self.knowledge_base_path = knowledge_base_path
         self.text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+        # クライアントが渡されなかった場合はプロバイダーと共有のクライアントを使用する
+        self.client = client
 
     # ★★★ このメソッドを修正 ★★★
     async def _extract_search_query(self, prompt: str) -> str:
@@ -51,52 +128,114 @@ class RAGManager:
             # LLMの応答からキーワードをクリーンアップして抽出
             query = response.get('text', prompt).strip()
             
-            # 万が一、LLMが余計なテキストを返した場合に備えて後処理を追加
-            # 「出力：」や「検索キーワード：」のような接頭辞を削除
-            query = re.sub(r'^(出力|検索キーワード)[:：\s]*', '', query).strip()
-            # クォーテーションを削除
-            query = query.replace("「", "").replace("」", "").replace("\"", "").replace("'", "")
+            query = _sanitize_query(query)
 
-            logger.info(f"抽出・サニタイズされたWikipedia検索クエリ: '{query}'")
+            logger.info("抽出・サニタイズされたWikipedia検索クエリ: '%s'", query)
             return query
         except Exception as e:
-            logger.error(f"検索クエリの抽出中にエラー: {e}")
+            logger.error("検索クエリの抽出中にエラー: %s", e)
             return prompt # 失敗した場合は元のプロンプトをクエリとする
 
+    async def classify_and_extract(self, prompt: str) -> Optional[Dict[str, Any]]:
+        """
+        1回のJSONモード呼び出しで、Wikipediaの情報が必要かの判定と検索クエリの抽出を同時に行う。
+        応答を解釈できなかった場合はNoneを返す。
+        """
+        classification_prompt = f"""以下のユーザーの質問に答えるためにWikipediaの情報が必要かどうかを判断し、必要な場合はWikipediaで検索するのに最適な「検索キーワード」を抽出してください。
+計算、創作、一般的な会話など、外部の事実情報を必要としない質問では answer_uses_context を false にしてください。
+次のJSON形式のみで出力してください。
+
+{{"search_query": "検索キーワード", "answer_uses_context": true}}
+
+---
+質問: "{prompt}"
+---"""
+        try:
+            response = await self.provider.call(classification_prompt, "", json_mode=True)
+            # JSONモードで応答がJSONに制約されているため、本文全体をそのまま解釈する
+            data = json.loads(response.get('text') or '')
+            result = {
+                'search_query': _sanitize_query(str(data.get('search_query', ''))),
+                'answer_uses_context': _parse_bool(data.get('answer_uses_context'), default=True),
+            }
+            logger.info("検索要否の判定結果: %s", result)
+            return result
+        except Exception as e:
+            logger.warning("検索要否の判定に失敗したため、従来のクエリ抽出にフォールバックします: %s", e)
+            return None
+
+    async def _resolve_search_query(self, prompt: str) -> Optional[str]:
+        """Wikipedia検索クエリを決定する。検索が不要と判断された場合はNoneを返す。"""
+        if self.provider.get_capabilities().get(ProviderCapability.JSON_MODE, False):
+            result = await self.classify_and_extract(prompt)
+            if result is not None:
+                if not result['answer_uses_context']:
+                    return None
+                if result['search_query']:
+                    return result['search_query']
+        return await self._extract_search_query(prompt)
+
     async def _retrieve_from_wikipedia(self, query: str) -> str:
         """Wikipediaから情報を検索してコンテキストを生成する"""
-        logger.info(f"Wikipediaで検索中: '{query}'")
+        logger.info("Wikipediaで検索中: '%s'", query)
         try:
-            docs = WikipediaLoader(query=query, lang="ja", load_max_docs=2, doc_content_chars_max=2000).load()
-            if not docs:
+            client = self.client or await get_client()
+            texts = await fetch_wikipedia(client, query, lang="ja", max_docs=2, chars=2000, timeout=10.0)
+            if not texts:
                 logger.warning("Wikipediaで関連情報が見つかりませんでした。")
                 return ""
             
-            chunks = self.text_splitter.split_documents(docs)
+            # 分割処理はCPUを占有するため、イベントループを塞がないようスレッドで実行する
+            chunks = await asyncio.to_thread(self.text_splitter.create_documents, texts)
             return "\n\n".join([chunk.page_content for chunk in chunks])
 
         except Exception as e:
-            logger.error(f"Wikipedia検索中にエラー: {e}", exc_info=True)
+            logger.error("Wikipedia検索中にエラー: %s", e, exc_info=True)
             return ""
 
     async def _retrieve_from_knowledge_base(self, query: str) -> str:
         """ファイル/URLベースのナレッジベースから情報を検索する"""
         try:
-            kb = KnowledgeBase()
-            kb.load_documents(self.knowledge_base_path)
+            path = self.knowledge_base_path
+            # URLなどローカルファイルでないソースはmtimeを持たないためNoneをキーにする
+            mtime = os.path.getmtime(path) if os.path.exists(path) else None
+            # 読み込み・分割・ベクトル化と検索はブロッキング処理のため、スレッドで実行する
+            kb = await asyncio.to_thread(_load_kb, path, mtime)
             retriever = Retriever(kb)
-            return "\n\n".join(retriever.search(query))
+            results = await asyncio.to_thread(retriever.search, query)
+            return "\n\n".join(results)
         except Exception as e:
-            logger.error(f"ナレッジベースからの検索中にエラー: {e}", exc_info=True)
+            logger.error("ナレッジベースからの検索中にエラー: %s", e, exc_info=True)
             return ""
 
     async def retrieve_and_augment(self, original_prompt: str) -> str:
         """情報を検索し、プロンプトを拡張する"""
+        if not self.use_wikipedia and not self.knowledge_base_path:
+            return original_prompt
+
         retrieved_context = ""
         if self.use_wikipedia:
-            # 質問から検索クエリを抽出するステップを追加
-            search_query = await self._extract_search_query(original_prompt)
-            retrieved_context = await self._retrieve_from_wikipedia(search_query)
+            heuristic_query = _heuristic_query(original_prompt)
+            if heuristic_query:
+                # LLMによるクエリ抽出と並行して、簡易クエリでWikipediaを先行検索する
+                search_query, speculative_context = await asyncio.gather(
+                    self._resolve_search_query(original_prompt),
+                    self._retrieve_from_wikipedia(heuristic_query)
+                )
+                if search_query is None:
+                    logger.info("外部情報は不要と判断されたため、Wikipedia検索をスキップします。")
+                elif speculative_context and _normalize_query(search_query) == _normalize_query(heuristic_query):
+                    retrieved_context = speculative_context
+                else:
+                    # クエリが異なる場合は本来のクエリで再検索し、空なら先行検索の結果を使う
+                    retrieved_context = await self._retrieve_from_wikipedia(search_query) or speculative_context
+            else:
+                # 質問から検索クエリを抽出するステップを追加
+                search_query = await self._resolve_search_query(original_prompt)
+                if search_query is None:
+                    logger.info("外部情報は不要と判断されたため、Wikipedia検索をスキップします。")
+                else:
+                    retrieved_context = await self._retrieve_from_wikipedia(search_query)
         elif self.knowledge_base_path:
             retrieved_context = await self._retrieve_from_knowledge_base(original_prompt)
         
@@ -104,15 +243,6 @@ class RAGManager:
             logger.info("関連情報が見つからなかったため、プロンプトは拡張されません。")
             return original_prompt
         
-        augmented_prompt = f"""以下の「コンテキスト情報」を最優先の根拠として利用し、「元の質問」に答えてください。
-
-# コンテキスト情報
----
-{retrieved_context}
----
-
-# 元の質問
-{original_prompt}
-"""
+        augmented_prompt = _AUGMENTED_PROMPT_TEMPLATE.format_map({'context': retrieved_context, 'question': original_prompt})
         logger.info("プロンプトが検索されたコンテキストで拡張されました。")
         return augmented_prompt
\ No newline at end of file
@@ -8,7 +8,7 @@ from typing import NamedTuple, Optional
 
 # SerpApiの正しいインポート文に修正
 from serpapi import GoogleSearch
-from ..config import settings
+from ..config import get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +21,7 @@ class ImageResult(NamedTuple):
 
 def search(query: str) -> Optional[ImageResult]:
     """Performs an image search using SerpApi and returns the top result."""
+    settings = get_settings()
     api_key = settings.SERPAPI_API_KEY
     if not api_key:
         logger.warning("SERPAPI_API_KEYが設定されていません。画像検索はスキップされます。")
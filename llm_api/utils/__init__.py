@@ -2,15 +2,20 @@
 """
 llm_api/utils パッケージ
 """
-from .helper_functions import read_from_pipe_or_file, format_json_output
+from .helper_functions import read_from_pipe_or_file, iter_prompt_chunks, format_json_output
 from .performance_monitor import PerformanceMonitor
+from .http import close_client, get_client, make_async_client
 
 # analyzerはcogniquantumモジュールに移動したため、このインポートは不要
 # from .analyzer import ProblemAnalyzer 
 
 __all__ = [
     "read_from_pipe_or_file",
+    "iter_prompt_chunks",
     "format_json_output",
     "PerformanceMonitor",
+    "make_async_client",
+    "get_client",
+    "close_client",
     # "ProblemAnalyzer",
 ]
\ No newline at end of file
@@ -0,0 +1,62 @@
+# /llm_api/utils/cache.py
+# タイトル: Async LRU + TTL Cache
+# 役割: 同一プロンプトに対するLLM応答を再利用するための非同期LRU/TTLキャッシュを提供する。
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class AsyncTTLCache:
+    """
+    有効期限付きのLRUキャッシュ。値はJSON文字列として保持し、取得時に新しい辞書として復元する。
+    """
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600):
+        """
+        Args:
+            maxsize (int): 保持する最大エントリ数。超過時は最も古く使われたものから破棄する。
+            ttl (float): エントリの有効期限（秒）。
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple[float, str]]" = OrderedDict()
+        self._lock = asyncio.Lock()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """キーに対応する値を返す。存在しないか期限切れの場合はNone。"""
+        async with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+        return json.loads(value)
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        """値を保存する。"""
+        serialized = json.dumps(value, ensure_ascii=False, default=str)
+        async with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, serialized)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    async def clear(self):
+        """全エントリを破棄する。"""
+        async with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def make_cache_key(*parts: Any) -> str:
+    """任意の値の組からキャッシュキー（blake2bハッシュ）を生成する。"""
+    normalized = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
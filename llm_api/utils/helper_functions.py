@@ -1,18 +1,22 @@
 # /llm_api/utils/helper_functions.py
 
 import json
+import functools
 import sys
 import asyncio
 import aiofiles
-from typing import Optional
+from typing import AsyncIterator, Optional
+
+try:
+    import orjson
+except ImportError:  # orjsonが無い環境では標準ライブラリのjsonで代替する
+    orjson = None
 
 async def read_from_pipe_or_file(prompt_arg: Optional[str], file_arg: Optional[str]) -> Optional[str]:
     """パイプまたはファイルからプロンプトを非同期に読み込む"""
     if not sys.stdin.isatty():
-        # データがパイプされている場合 - 正しい非同期読み込みに修正
-        loop = asyncio.get_event_loop()
-        stdin_content = await loop.run_in_executor(None, sys.stdin.read)
-        return stdin_content
+        # データがパイプされている場合 - ブロッキングな読み込みはスレッドで行う
+        return await asyncio.to_thread(sys.stdin.read)
     if file_arg:
         # ファイルが指定されている場合
         try:
@@ -27,10 +31,26 @@ async def read_from_pipe_or_file(prompt_arg: Optional[str], file_arg: Optional[s
         return prompt_arg
     return None
 
+async def iter_prompt_chunks(file_arg: str, chunk: int = 65536) -> AsyncIterator[str]:
+    """巨大なプロンプトファイルを一定サイズのチャンクごとに非同期に読み込む"""
+    async with aiofiles.open(file_arg, mode='r', encoding='utf-8') as f:
+        while True:
+            data = await f.read(chunk)
+            if not data:
+                break
+            yield data
+
 def format_json_output(data: dict) -> str:
     """辞書データを整形されたJSON文字列に変換する"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            # orjsonが扱えない値（64bitを超える整数など）は標準のjsonに任せる
+            pass
     return json.dumps(data, indent=2, ensure_ascii=False)
 
+@functools.lru_cache(maxsize=256)
 def get_model_family(model_name: str) -> str:
     """
     モデル名からモデルファミリーを判定する関数。
@@ -41,7 +61,7 @@ def get_model_family(model_name: str) -> str:
     
     model_name_lower = model_name.lower()
     
-    # 一般的なモデルファミリーのキーワードで判定
+    # 一般的なモデルファミリーのキーワードで判定（判定順が優先順位を表す）
     if 'llama' in model_name_lower:
         return 'llama'
     if 'qwen' in model_name_lower:
@@ -53,4 +73,4 @@ def get_model_family(model_name: str) -> str:
     if 'phi' in model_name_lower:
         return 'phi'
     
-    return 'unknown'
\ No newline at end of file
+    return 'unknown'
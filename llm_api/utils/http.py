@@ -0,0 +1,64 @@
+# /llm_api/utils/http.py
+# タイトル: Shared HTTP Client Factory
+# 役割: 接続プール設定を一元化したhttpx.AsyncClientを生成し、全プロバイダーで共有する単一のクライアントを管理する。
+
+import asyncio
+import logging
+from typing import Optional
+
+import httpx
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# 共有クライアントの既定タイムアウト。用途ごとの値はリクエスト時に timeout= で上書きする
+_DEFAULT_TIMEOUT = 30.0
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def make_async_client(timeout: float) -> httpx.AsyncClient:
+    """設定された接続プール上限を適用したhttpx.AsyncClientを生成する。"""
+    settings = get_settings()
+    limits = httpx.Limits(
+        max_connections=settings.HTTPX_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.HTTPX_MAX_KEEPALIVE,
+        keepalive_expiry=settings.HTTPX_KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncClient(timeout=timeout, limits=limits)
+
+
+async def get_client() -> httpx.AsyncClient:
+    """
+    プロセス全体で共有するhttpx.AsyncClientを返す。初回呼び出し時に生成する。
+    接続はイベントループに紐づくため、ループが変わった場合やクローズ済みの場合は作り直す。
+    作り直す際は古いクライアントを閉じ、接続プールのソケットを残さない。
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        stale = _client
+        _client = make_async_client(timeout=_DEFAULT_TIMEOUT)
+        _client_loop = loop
+        if stale is not None and not stale.is_closed:
+            await _close_stale_client(stale)
+    return _client
+
+
+async def _close_stale_client(client: httpx.AsyncClient):
+    """以前のイベントループで生成された古いクライアントを閉じる。"""
+    try:
+        await client.aclose()
+    except RuntimeError as e:
+        # 元のループが既に閉じている場合、トランスポートは正常に閉じられない。参照を手放してGCに委ねる
+        logger.debug("古い共有クライアントのクローズに失敗: %s", e)
+
+
+async def close_client():
+    """共有クライアントを閉じる。アプリケーションの終了時に呼び出す。"""
+    global _client, _client_loop
+    client, _client, _client_loop = _client, None, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
@@ -0,0 +1,116 @@
+# /llm_api/utils/ratelimit.py
+# タイトル: Token Bucket Rate Limiter
+# 役割: プロバイダー・モデルごとのRPM/TPM上限に合わせてリクエストを整形し、429応答のRetry-Afterに従って再試行する。
+
+import asyncio
+import logging
+import time
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class TokenBucket:
+    """
+    1分あたりのリクエスト数（RPM）とトークン数（TPM）を制限するトークンバケット。
+    どちらかがNoneの場合、その次元は制限しない。
+    """
+    def __init__(self, rpm: Optional[int] = None, tpm: Optional[int] = None):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm) if rpm else 0.0
+        self._tokens = float(tpm) if tpm else 0.0
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        if self.rpm:
+            self._requests = min(float(self.rpm), self._requests + elapsed * self.rpm / 60.0)
+        if self.tpm:
+            self._tokens = min(float(self.tpm), self._tokens + elapsed * self.tpm / 60.0)
+
+    async def acquire(self, est_tokens: int = 0):
+        """
+        リクエスト1件と推定トークン数分の容量が確保できるまで待機する。
+
+        Args:
+            est_tokens (int): このリクエストで消費すると見込まれるトークン数。
+        """
+        # 待機中のリクエストは到着順に処理する
+        async with self._lock:
+            needed_tokens = min(est_tokens, self.tpm) if self.tpm else 0
+            while True:
+                self._refill()
+                wait_times = []
+                if self.rpm and self._requests < 1:
+                    wait_times.append((1 - self._requests) * 60.0 / self.rpm)
+                if self.tpm and self._tokens < needed_tokens:
+                    wait_times.append((needed_tokens - self._tokens) * 60.0 / self.tpm)
+                if not wait_times:
+                    break
+                await asyncio.sleep(max(wait_times))
+
+            if self.rpm:
+                self._requests -= 1
+            if self.tpm:
+                self._tokens -= needed_tokens
+
+
+_buckets: Dict[Tuple[str, Optional[str]], TokenBucket] = {}
+
+def get_bucket(provider: str, model: Optional[str], rpm: Optional[int], tpm: Optional[int]) -> Optional[TokenBucket]:
+    """
+    (プロバイダー, モデル) ごとに共有されるバケットを返す。
+    RPM/TPMがどちらも設定されていない場合はNoneを返す。
+    """
+    if not rpm and not tpm:
+        return None
+    key = (provider, model)
+    bucket = _buckets.get(key)
+    if bucket is None:
+        bucket = _buckets[key] = TokenBucket(rpm=rpm, tpm=tpm)
+    return bucket
+
+def estimate_tokens(*texts: str) -> int:
+    """文字数からトークン数を大まかに見積もる（約4文字で1トークン）。"""
+    return sum(len(text) for text in texts if text) // 4
+
+def parse_retry_after(value: Optional[str], default: float = 1.0) -> float:
+    """Retry-Afterヘッダー（秒数またはHTTP日付）を待機秒数に変換する。"""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+async def call_with_rate_limit(bucket: Optional[TokenBucket], est_tokens: int, func: Callable[[], Awaitable[T]]) -> T:
+    """
+    バケットで流量を調整してから呼び出しを実行する。
+    429 (Too Many Requests) を受け取った場合はRetry-Afterに従って待機し、1回だけ再試行する。
+    """
+    if bucket:
+        await bucket.acquire(est_tokens)
+    try:
+        return await func()
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code != 429:
+            raise
+        delay = parse_retry_after(e.response.headers.get("Retry-After"))
+        logger.warning("レート制限 (429) を受けました。%.2f秒後に再試行します。", delay)
+        await asyncio.sleep(delay)
+        if bucket:
+            await bucket.acquire(est_tokens)
+        return await func()
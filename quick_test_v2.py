@@ -4,6 +4,7 @@ CogniQuantum V2 クイックテストスクリプト
 問題の診断と基本動作確認用（現在の実装対応版）
 """
 import asyncio
+import contextlib
 import json
 import logging
 import os
@@ -18,7 +19,7 @@ if project_root not in sys.path:
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-async def check_dependencies():
+async def check_dependencies(ctx: Dict[str, Any]):
     """必要な依存関係のチェック"""
     print("🔍 依存関係チェック中...")
     
@@ -66,32 +67,37 @@ async def check_dependencies():
     
     return True
 
-async def check_ollama_status() -> Tuple[bool, List[str]]:
-    """Ollamaの状態をチェック"""
+async def check_ollama_status(ctx: Dict[str, Any]) -> Tuple[bool, List[str]]:
+    """Ollamaの状態をチェック（結果はctxに保存し、2回目以降は再利用する）"""
+    if 'ollama' in ctx:
+        return ctx['ollama']
+
     print("\n🔍 Ollama状態チェック中...")
-    
-    try:
-        import httpx
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            try:
-                response = await client.get("http://localhost:11434/api/tags")
-                if response.status_code == 200:
-                    data = response.json()
-                    models = [model['name'] for model in data.get('models', [])]
-                    print(f"✅ Ollamaサーバー: 接続OK")
-                    print(f"📦 利用可能モデル: {models}")
-                    return True, models
-                else:
-                    print(f"❌ Ollamaサーバー: HTTP {response.status_code}")
-                    return False, []
-            except Exception as e:
-                print(f"❌ Ollamaサーバー: 接続失敗 ({e})")
-                return False, []
-    except ImportError:
+    ctx['ollama'] = await _probe_ollama(ctx.get('client'))
+    return ctx['ollama']
+
+async def _probe_ollama(client) -> Tuple[bool, List[str]]:
+    """共有クライアントでOllamaサーバーに問い合わせる"""
+    if client is None:
         print("❌ httpx がインストールされていません")
         return False, []
 
-async def test_basic_functionality():
+    try:
+        response = await client.get("http://localhost:11434/api/tags")
+        if response.status_code == 200:
+            data = response.json()
+            models = [model['name'] for model in data.get('models', [])]
+            print(f"✅ Ollamaサーバー: 接続OK")
+            print(f"📦 利用可能モデル: {models}")
+            return True, models
+        else:
+            print(f"❌ Ollamaサーバー: HTTP {response.status_code}")
+            return False, []
+    except Exception as e:
+        print(f"❌ Ollamaサーバー: 接続失敗 ({e})")
+        return False, []
+
+async def test_basic_functionality(ctx: Dict[str, Any]):
     """基本機能のテスト"""
     print("\n🧪 基本機能テスト中...")
     
@@ -116,7 +122,7 @@ async def test_basic_functionality():
         print(f"❌ 基本機能テスト失敗: {e}")
         return False
 
-async def test_config_loading():
+async def test_config_loading(ctx: Dict[str, Any]):
     """設定読み込みテスト"""
     print("\n⚙️ 設定読み込みテスト中...")
     
@@ -144,7 +150,7 @@ async def test_config_loading():
         print(f"❌ 設定読み込み失敗: {e}")
         return False
 
-async def test_provider_creation():
+async def test_provider_creation(ctx: Dict[str, Any]):
     """プロバイダー作成テスト"""
     print("\n🏭 プロバイダー作成テスト中...")
     success = True
@@ -177,12 +183,12 @@ async def test_provider_creation():
         print(f"❌ プロバイダー作成テストのインポート中に失敗: {e}")
         return False
 
-async def test_simple_call():
+async def test_simple_call(ctx: Dict[str, Any]):
     """シンプルな呼び出しテスト"""
     print("\n📞 シンプル呼び出しテスト中...")
     
-    # このテストはOllamaが利用可能な場合にのみ実行
-    ollama_ok, models = await check_ollama_status()
+    # このテストはOllamaが利用可能な場合にのみ実行（状態チェックの結果を再利用）
+    ollama_ok, models = await check_ollama_status(ctx)
     if not ollama_ok or not models:
         print("⚠️ Ollama利用不可のため、呼び出しテストをスキップ")
         return True
@@ -211,12 +217,12 @@ async def test_simple_call():
         print(f"❌ 呼び出しテスト失敗: {e}")
         return False
 
-async def test_v2_enhanced_call():
+async def test_v2_enhanced_call(ctx: Dict[str, Any]):
     """V2拡張呼び出しテスト"""
     print("\n🚀 V2拡張呼び出しテスト中...")
     
-    # Ollamaの確認
-    ollama_ok, models = await check_ollama_status()
+    # Ollamaの確認（状態チェックの結果を再利用）
+    ollama_ok, models = await check_ollama_status(ctx)
     if not ollama_ok or not models:
         print("⚠️ Ollama利用不可のため、V2テストをスキップ")
         return True
@@ -369,19 +375,30 @@ async def main():
             ("V2拡張呼び出しテスト", test_v2_enhanced_call)
         ])
     
+    try:
+        import httpx
+        client_cm = httpx.AsyncClient(timeout=5.0)
+    except ImportError:
+        # httpxの不足は依存関係チェックで報告される
+        client_cm = contextlib.nullcontext()
+
     results = []
-    for test_name, test_func in tests:
-        try:
-            # check_ollama_statusはタプルを返すので特別扱い
-            if test_name == "Ollama状態チェック":
-                result, _ = await test_func()
-                results.append((test_name, result))
-            else:
-                result = await test_func()
-                results.append((test_name, result))
-        except Exception as e:
-            logger.error(f"{test_name}でエラー: {e}")
-            results.append((test_name, False))
+    # テスト間で状態と接続を共有する
+    ctx: Dict[str, Any] = {}
+    async with client_cm as client:
+        ctx['client'] = client
+        for test_name, test_func in tests:
+            try:
+                # check_ollama_statusはタプルを返すので特別扱い
+                if test_name == "Ollama状態チェック":
+                    result, _ = await test_func(ctx)
+                    results.append((test_name, result))
+                else:
+                    result = await test_func(ctx)
+                    results.append((test_name, result))
+            except Exception as e:
+                logger.error(f"{test_name}でエラー: {e}")
+                results.append((test_name, False))
     
     print("\n" + "=" * 50)
     print("📊 テスト結果サマリー:")
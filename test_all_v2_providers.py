@@ -3,14 +3,23 @@
 # 役割: 現在のプロジェクト構造に合わせて修正されたプロバイダーの動作確認と性能測定を行う。
 
 import asyncio
+import gzip
+import io
 import json
 import logging
 import os
 import sys
 import time
-from typing import Dict, Any, List
+from collections import defaultdict
+from types import MappingProxyType
+from typing import Any, ClassVar, Dict, List, Mapping, Optional, Set, Tuple
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # orjsonが無い環境では標準ライブラリのjsonで代替する
+    orjson = None
+
 # パスの設定
 project_root = Path(__file__).parent
 if str(project_root) not in sys.path:
@@ -26,71 +35,160 @@ except ImportError:
 # 他のモジュールをインポート
 from llm_api.providers import get_provider, list_providers, list_enhanced_providers, check_provider_health
 from llm_api.config import settings
+from llm_api.utils.http import close_client, get_client
 
 logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format='%(asctime)s - %(levelname)s - %(name)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# プロバイダー名 -> (APIキーの設定名, キーの接頭辞)
+_API_KEY_SETTINGS = {
+    'openai': ('OPENAI_API_KEY', 'sk-'),
+    'claude': ('CLAUDE_API_KEY', 'sk-ant-'),
+    'gemini': ('GEMINI_API_KEY', 'AIza'),
+    'huggingface': ('HF_TOKEN', 'hf_'),
+}
+
+# レポートに残す改善情報の値の型（入れ子の大きな構造は保持しない）
+_SCALAR_TYPES = (str, int, float, bool, type(None))
+
+def _is_valid_key(key, prefix: str) -> bool:
+    """APIキーが想定する接頭辞を持ち、十分な長さがあるかを判定する"""
+    return bool(key and key.startswith(prefix) and len(key) > 20)
+
+# プロバイダーごとの同時実行数の上限（レート制限による429・リトライでかえって遅くならないようにする）
+_LIMITS = {'openai': 4, 'claude': 2, 'gemini': 4, 'ollama': 8, 'huggingface': 2, 'llamacpp': 2}
+_DEFAULT_LIMIT = 4
+
+_DEFAULT_V2_MODES = ('efficient', 'balanced', 'decomposed', 'adaptive', 'parallel', 'quantum_inspired', 'edge', 'speculative_thought')
+
 class V2ProviderTester:
     """V2プロバイダーの総合テスター"""
+
+    # モードごとのテストプロンプト（読み取り専用の共有マッピング）
+    _PROMPTS: ClassVar[Mapping[str, str]] = MappingProxyType({
+        'efficient': "1+1は?",
+        'balanced': "機械学習とは何かを簡潔に説明して。",
+        'decomposed': "持続可能な都市交通システムの設計案を考えて。",
+        'adaptive': "太陽光発電のメリットとデメリットは？",
+        'parallel': "量子コンピュータの将来性について。",
+        'quantum_inspired': "意識の謎について、複数の視点から考察して。",
+        'edge': "色を混ぜるとどうなる？",
+        'speculative_thought': "AIの未来について思考実験してください。"
+    })
+    _DEFAULT_PROMPT: ClassVar[str] = "一般的なテストプロンプトです。"
     
-    def __init__(self, providers_to_test=None, modes_to_test=None):
+    def __init__(self, providers_to_test=None, modes_to_test=None, mode_timeout: float = 300.0, call_timeout: float = 30.0, compress_report: bool = True):
         self.test_results: Dict[str, Any] = {}
+        # コンソール出力はバッファに溜め、フェーズ単位でまとめて書き出す
+        self._out = io.StringIO()
+        # 1モードあたりのテスト全体のタイムアウト（秒）
+        self._mode_timeout = mode_timeout
+        # プロバイダー呼び出し1回あたりのタイムアウト（秒）
+        self._call_timeout = call_timeout
+        # レポートをgzip圧縮して保存するか
+        self._compress_report = compress_report
+        # プロバイダー一覧は実行中に変わらないため、一度だけ取得して使い回す
+        self._all_providers = list_providers()
+        self._enhanced_providers = list_enhanced_providers()
+        self._v2_set = frozenset(self._enhanced_providers.get('v2', []))
+        self._v2_count = len(self._v2_set)
+        # 健全性チェックで利用可能と確認されたV2拡張プロバイダー（チェック前は全V2拡張を対象とする）
+        self._v2_available: Set[str] = set(self._v2_set)
+        # V2拡張プロバイダーはモード間で使い回し、接続プールを活かす
+        self._provider_cache: Dict[str, Any] = {}
+        self._provider_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        # Ollamaの接続確認結果（接続可否とモデル一覧）。初回の確認結果をセッションを通じて使い回す
+        self._ollama_status: Optional[Tuple[bool, List[str]]] = None
+        self._ollama_lock = asyncio.Lock()
         # 利用可能なプロバイダーを動的に設定
         self.available_providers = self._get_available_providers()
-        self.providers_to_test = providers_to_test or self.available_providers
-        self.v2_modes = modes_to_test or ['efficient', 'balanced', 'decomposed', 'adaptive', 'parallel', 'quantum_inspired', 'edge', 'speculative_thought']
+        self.providers_to_test = providers_to_test or sorted(self.available_providers)
+        self.v2_modes = tuple(modes_to_test) if modes_to_test else _DEFAULT_V2_MODES
+        self._sem: Dict[str, asyncio.Semaphore] = {
+            p: asyncio.Semaphore(_LIMITS.get(p, _DEFAULT_LIMIT)) for p in self.providers_to_test
+        }
 
-    def _get_available_providers(self) -> List[str]:
-        """APIキーが設定されているなど、利用可能なプロバイダーのリストを取得する"""
-        available = []
-        all_providers = list_providers()
+    def _get_available_providers(self) -> Set[str]:
+        """APIキーが設定されているなど、利用可能なプロバイダーの集合を取得する"""
+        all_providers = self._all_providers
         
         # APIキーの存在と有効性をチェック
-        api_key_checks = {
-            'openai': settings.OPENAI_API_KEY and settings.OPENAI_API_KEY.startswith('sk-') and len(settings.OPENAI_API_KEY) > 20,
-            'claude': settings.CLAUDE_API_KEY and settings.CLAUDE_API_KEY.startswith('sk-ant-') and len(settings.CLAUDE_API_KEY) > 20,
-            'gemini': settings.GEMINI_API_KEY and settings.GEMINI_API_KEY.startswith('AIza') and len(settings.GEMINI_API_KEY) > 20,
-            'huggingface': settings.HF_TOKEN and settings.HF_TOKEN.startswith('hf_') and len(settings.HF_TOKEN) > 20,
+        available = {
+            provider for provider, (key_name, prefix) in _API_KEY_SETTINGS.items()
+            if provider in all_providers and _is_valid_key(getattr(settings, key_name, None), prefix)
         }
         
-        for provider, has_valid_key in api_key_checks.items():
-            if has_valid_key and provider in all_providers:
-                available.append(provider)
-        
         # Ollamaは常にチェック対象とする（ローカルで動作）
         if 'ollama' in all_providers:
-            available.append('ollama')
+            available.add('ollama')
             
         # LlamaCppもローカルで動作する可能性がある（設定されている場合のみ）
         if 'llamacpp' in all_providers and settings.LLAMACPP_API_BASE_URL:
-            available.append('llamacpp')
+            available.add('llamacpp')
             
-        return list(set(available))
+        return available
+
+    def _emit(self, message: str):
+        """出力をバッファに追加する"""
+        self._out.write(message)
+        self._out.write("\n")
 
-    async def check_ollama_connection(self) -> tuple[bool, List[str]]:
-        """Ollamaサーバーの接続確認とモデル一覧取得"""
+    def _flush(self):
+        """バッファに溜めた出力を標準出力へ一度に書き出す"""
+        sys.stdout.write(self._out.getvalue())
+        sys.stdout.flush()
+        self._out.seek(0)
+        self._out.truncate()
+
+    async def _get_enhanced_provider(self, provider_name: str) -> Any:
+        """V2拡張プロバイダーを取得する。同一プロバイダーはテストセッションを通じて1インスタンスを共有する"""
+        provider = self._provider_cache.get(provider_name)
+        if provider is not None:
+            return provider
+        async with self._provider_locks[provider_name]:
+            provider = self._provider_cache.get(provider_name)
+            if provider is None:
+                provider = self._provider_cache[provider_name] = get_provider(provider_name, enhanced=True)
+            return provider
+
+    async def aclose(self):
+        """テスト中に生成したプロバイダーと共有HTTPクライアントを解放する"""
+        while self._provider_cache:
+            _, provider = self._provider_cache.popitem()
+            try:
+                await provider.aclose()
+            except Exception as e:
+                logger.warning("プロバイダーのクローズ中にエラー: %s", e)
+        await close_client()
+
+    async def check_ollama_connection(self) -> Tuple[bool, List[str]]:
+        """Ollamaサーバーの接続確認とモデル一覧取得。共有クライアントで一度だけ確認し、結果をキャッシュする"""
+        if self._ollama_status is not None:
+            return self._ollama_status
+        async with self._ollama_lock:
+            if self._ollama_status is None:
+                self._ollama_status = await self._probe_ollama()
+            return self._ollama_status
+
+    async def _probe_ollama(self) -> Tuple[bool, List[str]]:
+        """Ollamaの/api/tagsに問い合わせ、接続可否とモデル名一覧を返す"""
         try:
-            import httpx
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                try:
-                    response = await client.get("http://localhost:11434/api/tags")
-                    if response.status_code == 200:
-                        data = response.json()
-                        models = [model['name'] for model in data.get('models', [])]
-                        return True, models
-                    else:
-                        return False, []
-                except Exception:
-                    return False, []
-        except ImportError:
+            client = await get_client()
+            response = await client.get("http://localhost:11434/api/tags", timeout=5.0)
+            if response.status_code != 200:
+                return False, []
+            models = [model['name'] for model in response.json().get('models', [])]
+            return True, models
+        except Exception:
             return False, []
 
     async def run_comprehensive_tests(self):
         """総合テストの実行"""
-        print("🚀 CogniQuantum V2 プロバイダー総合テスト開始")
-        print(f"🔬 テスト対象プロバイダー: {self.providers_to_test}")
-        print(f"🕹️ テスト対象モード: {self.v2_modes}")
-        print("=" * 60)
+        self._emit("🚀 CogniQuantum V2 プロバイダー総合テスト開始")
+        self._emit(f"🔬 テスト対象プロバイダー: {self.providers_to_test}")
+        self._emit(f"🕹️ テスト対象モード: {self.v2_modes}")
+        self._emit("=" * 60)
+        self._flush()
         
         await self.collect_system_info()
         await self.check_all_providers_health()
@@ -100,7 +198,7 @@ class V2ProviderTester:
 
     async def collect_system_info(self):
         """システム情報の収集"""
-        print("\n📊 システム情報を収集中...")
+        self._emit("\n📊 システム情報を収集中...")
         
         # APIキーの状態チェック
         api_key_status = {
@@ -120,161 +218,188 @@ class V2ProviderTester:
             'timestamp': time.time(),
             'python_version': sys.version,
             'working_directory': str(project_root),
-            'standard_providers': list_providers(),
-            'enhanced_providers': list_enhanced_providers(),
+            'standard_providers': self._all_providers,
+            'enhanced_providers': self._enhanced_providers,
             'api_key_status': api_key_status,
             'ollama_connected': ollama_connected,
             'ollama_models': ollama_models,
             'llamacpp_configured': llamacpp_available,
-            'available_providers': self.available_providers,
+            'available_providers': sorted(self.available_providers),
         }
-        print("✅ システム情報収集完了")
+        self._emit("✅ システム情報収集完了")
         
         # APIキー状態を表示
-        print("🔑 APIキー状態:")
+        self._emit("🔑 APIキー状態:")
         for service, has_key in api_key_status.items():
             status = "✅ 設定済み" if has_key else "❌ 未設定"
-            print(f"   - {service}: {status}")
+            self._emit(f"   - {service}: {status}")
         
         if ollama_connected:
-            print(f"🦙 Ollama接続: ✅ ({len(ollama_models)}モデル利用可能)")
+            self._emit(f"🦙 Ollama接続: ✅ ({len(ollama_models)}モデル利用可能)")
         else:
-            print("🦙 Ollama接続: ❌")
+            self._emit("🦙 Ollama接続: ❌")
             
         if llamacpp_available:
-            print(f"🔥 LlamaCpp設定: ✅ ({settings.LLAMACPP_API_BASE_URL})")
+            self._emit(f"🔥 LlamaCpp設定: ✅ ({settings.LLAMACPP_API_BASE_URL})")
         else:
-            print("🔥 LlamaCpp設定: ❌")
+            self._emit("🔥 LlamaCpp設定: ❌")
         
-        print(f"🎯 テスト可能プロバイダー: {self.available_providers}")
+        self._emit(f"🎯 テスト可能プロバイダー: {sorted(self.available_providers)}")
+        self._flush()
 
     async def check_all_providers_health(self):
         """全プロバイダーの健全性チェック"""
-        print("\n🏥 プロバイダー健全性チェック中...")
+        self._emit("\n🏥 プロバイダー健全性チェック中...")
         health_results: Dict[str, Any] = {'providers': {}}
         available_count = 0
         enhanced_v2_count = 0
 
-        for provider_name in list_providers():
+        all_providers = self._all_providers
+
+        # 各チェックはプロバイダーの初期化を伴う同期処理のため、スレッドに逃がして並行実行する
+        probes = []
+        for provider_name in all_providers:
             health_results['providers'][provider_name] = {}
-            
-            # 標準プロバイダーのチェック
-            try:
-                std_health = check_provider_health(provider_name, enhanced=False)
-                health_results['providers'][provider_name]['standard'] = std_health
-                if std_health['available']:
+            probes.append((provider_name, 'standard', False))
+            if provider_name in self._v2_set:
+                probes.append((provider_name, 'enhanced_v2', True))
+
+        results = await asyncio.gather(
+            *(asyncio.wait_for(asyncio.to_thread(check_provider_health, name, enhanced=enhanced), timeout=5)
+              for name, _, enhanced in probes),
+            return_exceptions=True
+        )
+
+        labels = {'standard': '標準', 'enhanced_v2': 'V2拡張'}
+        for (provider_name, kind, _), health in zip(probes, results):
+            label = labels[kind]
+            if isinstance(health, asyncio.TimeoutError):
+                health = TimeoutError("5秒以内に応答がありませんでした")
+            if isinstance(health, Exception):
+                health_results['providers'][provider_name][kind] = {'available': False, 'reason': str(health)}
+                self._emit(f"   ⚠️ {provider_name} ({label}): エラー {health}")
+                continue
+            health_results['providers'][provider_name][kind] = health
+            if health['available']:
+                if kind == 'standard':
                     available_count += 1
-                    print(f"   ✅ {provider_name} (標準)")
                 else:
-                    print(f"   ❌ {provider_name} (標準): {std_health['reason']}")
-            except Exception as e:
-                health_results['providers'][provider_name]['standard'] = {'available': False, 'reason': str(e)}
-                print(f"   ⚠️ {provider_name} (標準): エラー {e}")
-                
-            # V2拡張プロバイダーのチェック
-            enhanced_v2_providers = list_enhanced_providers().get('v2', [])
-            if provider_name in enhanced_v2_providers:
-                try:
-                    enh_health = check_provider_health(provider_name, enhanced=True)
-                    health_results['providers'][provider_name]['enhanced_v2'] = enh_health
-                    if enh_health['available']:
-                        enhanced_v2_count += 1
-                        print(f"   ✅ {provider_name} (V2拡張)")
-                    else:
-                        print(f"   ❌ {provider_name} (V2拡張): {enh_health['reason']}")
-                except Exception as e:
-                    health_results['providers'][provider_name]['enhanced_v2'] = {'available': False, 'reason': str(e)}
-                    print(f"   ⚠️ {provider_name} (V2拡張): エラー {e}")
+                    enhanced_v2_count += 1
+                self._emit(f"   ✅ {provider_name} ({label})")
+            else:
+                self._emit(f"   ❌ {provider_name} ({label}): {health['reason']}")
         
         health_results['summary'] = {
-            'total_checked': len(list_providers()),
+            'total_checked': len(all_providers),
             'available': available_count,
             'enhanced_v2': enhanced_v2_count
         }
         self.test_results['health_check'] = health_results
-        print("✅ 健全性チェック完了")
+        self._v2_available = {
+            name for name, data in health_results['providers'].items()
+            if data.get('enhanced_v2', {}).get('available')
+        }
+        self._emit("✅ 健全性チェック完了")
+        self._flush()
 
     async def test_v2_features(self):
         """V2機能の詳細テスト"""
-        print("\n🧪 V2機能テスト中...")
+        self._emit("\n🧪 V2機能テスト中...")
         self.test_results['v2_features'] = {}
         
-        enhanced_v2_providers = list_enhanced_providers().get('v2', [])
-        
         # 利用可能なプロバイダーのみをテスト
         testable_providers = [p for p in self.providers_to_test if p in self.available_providers]
         
         if not testable_providers:
-            print("⚠️ テスト可能なプロバイダーがありません。APIキーの設定またはOllamaの起動を確認してください。")
+            self._emit("⚠️ テスト可能なプロバイダーがありません。APIキーの設定またはOllamaの起動を確認してください。")
+            self._flush()
             return
         
-        print(f"🎯 実際にテストするプロバイダー: {testable_providers}")
+        self._emit(f"🎯 実際にテストするプロバイダー: {testable_providers}")
         
+        targets = []
         for provider_name in testable_providers:
-            if provider_name not in enhanced_v2_providers:
-                print(f"⚠️ {provider_name}: V2拡張が利用できません。スキップします。")
+            if provider_name not in self._v2_set:
+                self._emit(f"⚠️ {provider_name}: V2拡張が利用できません。スキップします。")
                 continue
+            if provider_name not in self._v2_available:
+                # 健全性チェックで失敗したプロバイダーは必ず失敗するため、テストを組まずにスキップする
+                self._emit(f"⚠️ {provider_name}: 健全性チェックに失敗しているためスキップします。")
+                self.test_results['v2_features'][provider_name] = {'skipped': 'provider unhealthy'}
+                continue
+            targets.append(provider_name)
 
-            print(f"\n🔍 {provider_name} V2機能テスト開始...")
-            provider_results: Dict[str, Any] = {'modes_tested': {}, 'errors': []}
-            
-            # プロバイダー固有の事前チェック
-            if provider_name == 'ollama':
-                ollama_ok, models = await self.check_ollama_connection()
-                if not ollama_ok:
-                    print(f"   ❌ Ollamaサーバーに接続できません。スキップします。")
-                    provider_results['errors'].append("Ollamaサーバー接続失敗")
-                    self.test_results['v2_features'][provider_name] = provider_results
-                    continue
-                elif not models:
-                    print(f"   ❌ Ollamaにモデルがありません。スキップします。")
-                    provider_results['errors'].append("Ollamaモデル不在")
-                    self.test_results['v2_features'][provider_name] = provider_results
-                    continue
-            elif provider_name == 'llamacpp':
-                if not settings.LLAMACPP_API_BASE_URL:
-                    print(f"   ❌ LlamaCpp設定が不完全です。スキップします。")
-                    provider_results['errors'].append("LlamaCpp設定不完全")
-                    self.test_results['v2_features'][provider_name] = provider_results
-                    continue
-            
-            for mode in self.v2_modes:
-                try:
-                    result = await self.test_provider_mode(provider_name, mode)
-                    provider_results['modes_tested'][mode] = result
-                    status = "✅ 成功" if result['success'] else f"❌ 失敗: {result.get('error', '不明')[:100]}..."
-                    print(f"   - {mode}モード: {status}")
-                    
-                    # 少し待機してサーバーに負荷をかけすぎないようにする
-                    await asyncio.sleep(0.5)
-                    
-                except Exception as e:
-                    error_msg = f"{mode}モードテスト中にエラー: {str(e)[:100]}..."
-                    provider_results['errors'].append(error_msg)
-                    print(f"   - {mode}モード: ⚠️ エラー ({str(e)[:50]}...)")
-            
+        self._flush()
+
+        # プロバイダー間も並行してテストする
+        results = await asyncio.gather(*(self._test_provider_v2_features(p) for p in targets))
+        for provider_name, provider_results in zip(targets, results):
             self.test_results['v2_features'][provider_name] = provider_results
 
+    async def _test_provider_v2_features(self, provider_name: str) -> Dict[str, Any]:
+        """1つのプロバイダーについて全モードを並行してテストする"""
+        provider_results: Dict[str, Any] = {'modes_tested': {}, 'errors': []}
+        
+        # プロバイダー固有の事前チェック
+        if provider_name == 'ollama':
+            ollama_ok, models = await self.check_ollama_connection()
+            if not ollama_ok:
+                self._emit(f"   ❌ {provider_name}: Ollamaサーバーに接続できません。スキップします。")
+                provider_results['errors'].append("Ollamaサーバー接続失敗")
+                self._flush()
+                return provider_results
+            elif not models:
+                self._emit(f"   ❌ {provider_name}: Ollamaにモデルがありません。スキップします。")
+                provider_results['errors'].append("Ollamaモデル不在")
+                self._flush()
+                return provider_results
+        elif provider_name == 'llamacpp':
+            if not settings.LLAMACPP_API_BASE_URL:
+                self._emit(f"   ❌ {provider_name}: LlamaCpp設定が不完全です。スキップします。")
+                provider_results['errors'].append("LlamaCpp設定不完全")
+                self._flush()
+                return provider_results
+        
+        # 各モードはリモートLLMのI/O待ちが支配的なため並行実行し、1つのモードが停止しても全体が止まらないようタイムアウトを設ける
+        results = await asyncio.gather(
+            *(asyncio.wait_for(self.test_provider_mode(provider_name, mode), timeout=self._mode_timeout) for mode in self.v2_modes),
+            return_exceptions=True
+        )
+
+        lines = [f"\n🔍 {provider_name} V2機能テスト結果:"]
+        for mode, result in zip(self.v2_modes, results):
+            if isinstance(result, asyncio.TimeoutError):
+                result = TimeoutError(f"{self._mode_timeout}秒以内に完了しませんでした")
+            if isinstance(result, Exception):
+                error_msg = f"{mode}モードテスト中にエラー: {str(result)[:100]}..."
+                provider_results['errors'].append(error_msg)
+                lines.append(f"   - {mode}モード: ⚠️ エラー ({str(result)[:50]}...)")
+                continue
+            provider_results['modes_tested'][mode] = result
+            status = "✅ 成功" if result['success'] else f"❌ 失敗: {str(result.get('error') or '不明')[:100]}..."
+            lines.append(f"   - {mode}モード: {status}")
+        self._emit("\n".join(lines))
+        self._flush()
+        
+        return provider_results
+
     async def test_provider_mode(self, provider_name: str, mode: str) -> Dict[str, Any]:
         """特定のプロバイダーとモードをテスト"""
-        prompts = {
-            'efficient': "1+1は?",
-            'balanced': "機械学習とは何かを簡潔に説明して。",
-            'decomposed': "持続可能な都市交通システムの設計案を考えて。",
-            'adaptive': "太陽光発電のメリットとデメリットは？",
-            'parallel': "量子コンピュータの将来性について。",
-            'quantum_inspired': "意識の謎について、複数の視点から考察して。",
-            'edge': "色を混ぜるとどうなる？",
-            'speculative_thought': "AIの未来について思考実験してください。"
-        }
-        prompt = prompts.get(mode, "一般的なテストプロンプトです。")
+        prompt = self._PROMPTS.get(mode, self._DEFAULT_PROMPT)
+        semaphore = self._sem.get(provider_name)
+        if semaphore is None:
+            semaphore = self._sem[provider_name] = asyncio.Semaphore(_LIMITS.get(provider_name, _DEFAULT_LIMIT))
         
+        async with semaphore:
+            return await self._run_provider_mode(provider_name, mode, prompt)
+
+    async def _run_provider_mode(self, provider_name: str, mode: str, prompt: str) -> Dict[str, Any]:
+        """プロバイダーを1回呼び出し、結果を集計する"""
         try:
-            # V2拡張プロバイダーを直接取得
-            provider = get_provider(provider_name, enhanced=True)
-            start_time = time.time()
+            # V2拡張プロバイダーを取得（モード間で共有）
+            provider = await self._get_enhanced_provider(provider_name)
             
-            # モデル選択（Ollamaの場合）
+            # モデル選択（Ollamaの場合）。接続確認は計測対象に含めない
             call_kwargs = {'mode': mode}
             if provider_name == 'ollama':
                 # 利用可能なモデルを取得
@@ -283,31 +408,40 @@ class V2ProviderTester:
                     # 最初のモデルを使用
                     call_kwargs['model'] = models[0]
             
-            response = await provider.call(prompt, **call_kwargs)
-            execution_time = time.time() - start_time
+            start_time = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(provider.call(prompt, **call_kwargs), timeout=self._call_timeout)
+            except asyncio.TimeoutError:
+                return {'success': False, 'error': 'timeout', 'execution_time': self._call_timeout}
+            execution_time = time.perf_counter() - start_time
             
-            return {
+            # 応答本文は長さだけを記録し、テスト結果に全文や入れ子の詳細情報を保持し続けないようにする
+            improvements = response.get('paper_based_improvements') or {}
+            result = {
                 'success': not response.get('error'),
                 'error': response.get('error'),
-                'response_length': len(response.get('text', '')),
+                'response_length': len(response.get('text') or ''),
                 'execution_time': execution_time,
                 'version': response.get('version'),
-                'v2_improvements': response.get('paper_based_improvements', {}),
+                'v2_improvements': {k: v for k, v in improvements.items() if isinstance(v, _SCALAR_TYPES)},
                 'model_used': call_kwargs.get('model', 'default'),
             }
+            del response, improvements
+            return result
         except Exception as e:
             return {'success': False, 'error': str(e)}
 
     async def run_performance_tests(self):
         """パフォーマンステスト"""
-        print("\n⚡ パフォーマンステスト中...")
+        self._emit("\n⚡ パフォーマンステスト中...")
         
         # 利用可能なプロバイダーのみをテスト
         testable_providers = [p for p in self.providers_to_test if p in self.available_providers]
         
         if not testable_providers:
-            print("⚠️ パフォーマンステスト可能なプロバイダーがありません。")
+            self._emit("⚠️ パフォーマンステスト可能なプロバイダーがありません。")
             self.test_results['performance'] = {}
+            self._flush()
             return
         
         # 簡単なパフォーマンステストを実行
@@ -317,7 +451,7 @@ class V2ProviderTester:
         test_prompt = "Pythonとは何ですか？簡潔に説明してください。"
         
         for provider_name in testable_providers:
-            if provider_name not in list_enhanced_providers().get('v2', []):
+            if provider_name not in self._v2_available:
                 continue
                 
             # プロバイダー固有の事前チェック
@@ -329,20 +463,17 @@ class V2ProviderTester:
                 continue
             
             try:
-                provider = get_provider(provider_name, enhanced=True)
+                provider = await self._get_enhanced_provider(provider_name)
+                call_kwargs = {'mode': 'balanced'}
+                if provider_name == 'ollama':
+                    call_kwargs['model'] = models[0]
                 
                 # 3回実行して平均時間を計測
                 times = []
                 for i in range(3):
-                    start_time = time.time()
-                    call_kwargs = {'mode': 'balanced'}
-                    if provider_name == 'ollama':
-                        _, models = await self.check_ollama_connection()
-                        if models:
-                            call_kwargs['model'] = models[0]
-                    
+                    start_time = time.perf_counter()
                     response = await provider.call(test_prompt, **call_kwargs)
-                    execution_time = time.time() - start_time
+                    execution_time = time.perf_counter() - start_time
                     
                     if not response.get('error'):
                         times.append(execution_time)
@@ -356,56 +487,81 @@ class V2ProviderTester:
                         'max_time': max(times),
                         'runs': len(times)
                     }
-                    print(f"   {provider_name}: 平均 {performance_results[provider_name]['avg_time']:.2f}秒")
+                    self._emit(f"   {provider_name}: 平均 {performance_results[provider_name]['avg_time']:.2f}秒")
                 
             except Exception as e:
-                print(f"   {provider_name}: パフォーマンステストエラー ({str(e)[:50]}...)")
+                self._emit(f"   {provider_name}: パフォーマンステストエラー ({str(e)[:50]}...)")
+            self._flush()
         
         self.test_results['performance'] = performance_results
-        print("✅ パフォーマンステスト完了")
+        self._emit("✅ パフォーマンステスト完了")
+        self._flush()
 
     def generate_report(self):
         """最終レポートの生成"""
-        print("\n" + "=" * 60)
-        print("📊 総合テスト結果レポート")
-        print("=" * 60)
+        self._emit("\n" + "=" * 60)
+        self._emit("📊 総合テスト結果レポート")
+        self._emit("=" * 60)
         
         # サマリー表示
         health_summary = self.test_results.get('health_check', {}).get('summary', {})
-        print(f"\n🏥 健全性: {health_summary.get('available', 0)}/{health_summary.get('total_checked', 0)} のプロバイダーが利用可能")
-        print(f"   - V2拡張: {health_summary.get('enhanced_v2', 0)}/{len(list_enhanced_providers().get('v2', []))} が利用可能")
+        self._emit(f"\n🏥 健全性: {health_summary.get('available', 0)}/{health_summary.get('total_checked', 0)} のプロバイダーが利用可能")
+        self._emit(f"   - V2拡張: {health_summary.get('enhanced_v2', 0)}/{self._v2_count} が利用可能")
         
         v2_features = self.test_results.get('v2_features', {})
         if v2_features:
-            print("\n🧪 V2機能テスト結果:")
+            self._emit("\n🧪 V2機能テスト結果:")
             for provider, results in v2_features.items():
+                if results.get('skipped'):
+                    self._emit(f"   - {provider}: スキップ ({results['skipped']})")
+                    continue
                 success_count = sum(1 for res in results['modes_tested'].values() if res['success'])
                 total_modes = len(results['modes_tested'])
-                print(f"   - {provider}: {success_count}/{total_modes} モード成功")
+                self._emit(f"   - {provider}: {success_count}/{total_modes} モード成功")
                 
                 # エラーがあれば表示
                 if results.get('errors'):
                     for error in results['errors']:
-                        print(f"     ⚠️ {error}")
+                        self._emit(f"     ⚠️ {error}")
 
         # パフォーマンステスト結果
         performance = self.test_results.get('performance', {})
         if performance:
-            print("\n⚡ パフォーマンステスト結果:")
+            self._emit("\n⚡ パフォーマンステスト結果:")
             for provider, perf_data in performance.items():
-                print(f"   - {provider}: 平均応答時間 {perf_data['avg_time']:.2f}秒")
+                self._emit(f"   - {provider}: 平均応答時間 {perf_data['avg_time']:.2f}秒")
 
         self.save_json_report()
+        self._flush()
+
+    def _dump_results(self) -> bytes:
+        """テスト結果を整形済みJSONのバイト列に変換する"""
+        if orjson is not None:
+            try:
+                return orjson.dumps(
+                    self.test_results,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+                    default=str
+                )
+            except TypeError:
+                # orjsonが扱えない値（64bitを超える整数など）は標準のjsonに任せる
+                pass
+        return json.dumps(self.test_results, indent=2, ensure_ascii=False, default=str).encode('utf-8')
 
     def save_json_report(self):
         """JSONレポートの保存"""
         try:
-            report_file = project_root / "v2_test_report.json"
-            with open(report_file, 'w', encoding='utf-8') as f:
-                json.dump(self.test_results, f, indent=2, ensure_ascii=False, default=str)
-            print(f"\n💾 詳細レポートを '{report_file}' に保存しました。")
+            payload = self._dump_results()
+            if self._compress_report:
+                # 圧縮率より速度を優先し、レベル1で圧縮する
+                report_file = project_root / "v2_test_report.json.gz"
+                report_file.write_bytes(gzip.compress(payload, compresslevel=1))
+            else:
+                report_file = project_root / "v2_test_report.json"
+                report_file.write_bytes(payload)
+            self._emit(f"\n💾 詳細レポートを '{report_file}' に保存しました。")
         except Exception as e:
-            print(f"\n❌ レポートの保存に失敗しました: {e}")
+            self._emit(f"\n❌ レポートの保存に失敗しました: {e}")
 
 async def main():
     """メイン実行関数"""
@@ -414,19 +570,31 @@ async def main():
     parser.add_argument("--providers", nargs='+', help="テストするプロバイダーを指定 (例: openai ollama)")
     parser.add_argument("--modes", nargs='+', help="テストするモードを指定 (例: efficient balanced)")
     parser.add_argument("--skip-performance", action="store_true", help="パフォーマンステストをスキップ")
+    parser.add_argument("--mode-timeout", type=float, default=300.0, help="1モードあたりのテストのタイムアウト秒数")
+    parser.add_argument("--call-timeout", type=float, default=30.0, help="プロバイダー呼び出し1回あたりのタイムアウト秒数")
+    parser.add_argument("--no-compress", action="store_true", help="レポートをgzip圧縮せず、そのままのJSONで保存")
     args = parser.parse_args()
     
-    tester = V2ProviderTester(providers_to_test=args.providers, modes_to_test=args.modes)
+    tester = V2ProviderTester(
+        providers_to_test=args.providers,
+        modes_to_test=args.modes,
+        mode_timeout=args.mode_timeout,
+        call_timeout=args.call_timeout,
+        compress_report=not args.no_compress
+    )
     
     if args.skip_performance:
         # パフォーマンステストをスキップする簡易版
-        original_run_performance_tests = tester.run_performance_tests
         async def skip_performance():
-            print("\n⚡ パフォーマンステスト: スキップされました")
+            tester._emit("\n⚡ パフォーマンステスト: スキップされました")
             tester.test_results['performance'] = {}
+            tester._flush()
         tester.run_performance_tests = skip_performance
     
-    await tester.run_comprehensive_tests()
+    try:
+        await tester.run_comprehensive_tests()
+    finally:
+        await tester.aclose()
 
 if __name__ == "__main__":
     if sys.platform == 'win32':
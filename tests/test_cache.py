@@ -0,0 +1,142 @@
+# /tests/test_cache.py
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from llm_api.providers import base
+from llm_api.providers.base import LLMProvider
+from llm_api.utils import cache
+from llm_api.utils.cache import AsyncTTLCache, make_cache_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the cache's monotonic clock with a settable virtual clock."""
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+class CountingProvider(LLMProvider):
+    """Provider whose standard_call returns queued responses and counts invocations."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+        super().__init__()
+
+    def get_capabilities(self):
+        return {}
+
+    def should_use_enhancement(self, prompt, **kwargs):
+        return False
+
+    async def standard_call(self, prompt, system_prompt="", **kwargs):
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def response_cache(monkeypatch):
+    """Give base.cached_call a fresh cache and settable settings; yields the settings namespace."""
+    settings = SimpleNamespace(ENABLE_RESPONSE_CACHE=True)
+    monkeypatch.setattr(base, "get_settings", lambda: settings)
+    monkeypatch.setattr(base, "_response_cache", AsyncTTLCache(maxsize=8, ttl=60))
+    return settings
+
+
+class TestAsyncTTLCache:
+    """Tests for LRU eviction and TTL expiry of the response cache."""
+
+    def test_evicts_least_recently_used(self, clock):
+        store = AsyncTTLCache(maxsize=2, ttl=60)
+
+        async def run():
+            await store.set("a", {"v": 1})
+            await store.set("b", {"v": 2})
+            # Touching "a" makes "b" the least recently used entry
+            assert await store.get("a") == {"v": 1}
+            await store.set("c", {"v": 3})
+            return [await store.get(key) for key in ("a", "b", "c")]
+
+        assert asyncio.run(run()) == [{"v": 1}, None, {"v": 3}]
+
+    def test_entries_expire_after_ttl(self, clock):
+        store = AsyncTTLCache(maxsize=8, ttl=10)
+
+        async def run():
+            await store.set("k", {"text": "hello"})
+            clock[0] += 9.9
+            fresh = await store.get("k")
+            clock[0] += 0.2
+            stale = await store.get("k")
+            return fresh, stale
+
+        assert asyncio.run(run()) == ({"text": "hello"}, None)
+        assert len(store) == 0
+
+    def test_get_returns_independent_copy(self, clock):
+        store = AsyncTTLCache()
+
+        async def run():
+            await store.set("k", {"items": [1]})
+            first = await store.get("k")
+            first["items"].append(2)
+            return await store.get("k")
+
+        assert asyncio.run(run()) == {"items": [1]}
+
+
+class TestMakeCacheKey:
+    """Tests for cache key normalization."""
+
+    def test_dict_key_order_does_not_matter(self):
+        assert make_cache_key("ollama", "hi", {"temperature": 0.2, "mode": "balanced"}) == \
+            make_cache_key("ollama", "hi", {"mode": "balanced", "temperature": 0.2})
+
+    def test_different_values_produce_different_keys(self):
+        assert make_cache_key("ollama", "hi", {"temperature": 0.2}) != \
+            make_cache_key("ollama", "hi", {"temperature": 0.3})
+
+
+class TestCachedCall:
+    """Tests for how LLMProvider.cached_call uses the shared response cache."""
+
+    def _call_twice(self, provider, **kwargs):
+        async def run():
+            first = await provider.cached_call("hi", "sys", **kwargs)
+            second = await provider.cached_call("hi", "sys", **kwargs)
+            return first, second
+        return asyncio.run(run())
+
+    def test_repeated_call_is_served_from_cache(self, response_cache):
+        provider = CountingProvider({"text": "hello", "error": None})
+        first, second = self._call_twice(provider, temperature=0.2)
+        assert provider.calls == 1
+        assert first == second == {"text": "hello", "error": None}
+
+    def test_different_kwargs_are_not_shared(self, response_cache):
+        provider = CountingProvider({"text": "a", "error": None}, {"text": "b", "error": None})
+
+        async def run():
+            return [await provider.cached_call("hi", temperature=t) for t in (0.2, 0.3)]
+
+        assert [r["text"] for r in asyncio.run(run())] == ["a", "b"]
+        assert provider.calls == 2
+
+    def test_disabled_cache_always_calls_provider(self, response_cache):
+        response_cache.ENABLE_RESPONSE_CACHE = False
+        provider = CountingProvider({"text": "a", "error": None}, {"text": "b", "error": None})
+        first, second = self._call_twice(provider)
+        assert provider.calls == 2
+        assert (first["text"], second["text"]) == ("a", "b")
+        assert len(base._response_cache) == 0
+
+    def test_error_responses_are_not_cached(self, response_cache):
+        provider = CountingProvider({"text": "", "error": "boom"}, {"text": "ok", "error": None})
+        first, second = self._call_twice(provider)
+        assert provider.calls == 2
+        assert first["error"] == "boom"
+        assert second == {"text": "ok", "error": None}
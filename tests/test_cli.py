@@ -7,41 +7,36 @@ import sys
 # The main entry point of the CLI
 from fetch_llm_v2 import main
 
-@patch('fetch_llm_v2.get_provider')
-def test_cli_simple_prompt(mock_get_provider):
-    """Test a simple CLI call with a provider and prompt."""
-    mock_provider_instance = MagicMock()
-    mock_provider_instance.get_response.return_value = "CLI test successful"
-    mock_get_provider.return_value = mock_provider_instance
-    
-    test_args = ["fetch_llm_v2.py", "--provider", "openai", "--prompt", "Hello, world!"]
-    with patch.object(sys, 'argv', test_args):
-        main()
-
-    # Assertions
-    mock_get_provider.assert_called_with("enhanced_openai_v2", prefer_v2=True)
-    mock_provider_instance.get_response.assert_called_once_with("Hello, world!", mode='adaptive')
+@pytest.fixture
+def cli_mocks():
+    """Patch get_provider and yield it together with the provider instance it returns."""
+    with patch('fetch_llm_v2.get_provider') as mock_get_provider:
+        mock_provider_instance = MagicMock()
+        mock_provider_instance.get_response.return_value = "CLI test successful"
+        mock_get_provider.return_value = mock_provider_instance
+        yield mock_get_provider, mock_provider_instance
 
 
-@patch('fetch_llm_v2.get_provider')
-def test_cli_v2_mode_argument(mock_get_provider):
-    """Test that the --mode argument is passed correctly to the provider."""
-    mock_provider_instance = MagicMock()
-    mock_provider_instance.get_response.return_value = "Efficient mode test"
-    mock_get_provider.return_value = mock_provider_instance
+@pytest.mark.parametrize("argv,prompt,expected_mode", [
+    (["--provider", "openai", "--prompt", "Hello, world!"], "Hello, world!", "adaptive"),
+    (["--provider", "enhanced_openai_v2", "--mode", "efficient", "--prompt", "Be quick"], "Be quick", "efficient"),
+], ids=["simple_prompt", "v2_mode_argument"])
+def test_cli_dispatch(cli_mocks, argv, prompt, expected_mode):
+    """Test that a CLI call resolves the V2 provider and passes the prompt and --mode through."""
+    mock_get_provider, mock_provider_instance = cli_mocks
     
-    test_args = ["fetch_llm_v2.py", "--provider", "enhanced_openai_v2", "--mode", "efficient", "--prompt", "Be quick"]
+    test_args = ["fetch_llm_v2.py", *argv]
     with patch.object(sys, 'argv', test_args):
         main()
 
     mock_get_provider.assert_called_once_with("enhanced_openai_v2", prefer_v2=True)
-    mock_provider_instance.get_response.assert_called_once_with("Be quick", mode='efficient')
+    mock_provider_instance.get_response.assert_called_once_with(prompt, mode=expected_mode)
 
 
 @patch('fetch_llm_v2.CogniQuantumCLIV2Fixed.run_health_check')
-@patch('fetch_llm_v2.get_provider')
-def test_cli_health_check(mock_get_provider, mock_health_check):
+def test_cli_health_check(mock_health_check, cli_mocks):
     """Test that the --health-check argument calls the correct function and exits."""
+    mock_get_provider, _ = cli_mocks
     test_args = ["fetch_llm_v2.py", "--health-check"]
     with patch.object(sys, 'argv', test_args):
         with pytest.raises(SystemExit):
@@ -59,10 +54,9 @@ def test_cli_missing_prompt():
             main()
 
 
-@patch('fetch_llm_v2.get_provider')
-def test_cli_fallback_mechanism(mock_get_provider):
+def test_cli_fallback_mechanism(cli_mocks):
     """Test the provider fallback logic from V2 -> V1 -> standard."""
-    mock_provider_instance = MagicMock()
+    mock_get_provider, mock_provider_instance = cli_mocks
     # Simulate get_provider failing for V2 and V1, but succeeding for standard
     mock_get_provider.side_effect = [
         ValueError("V2 provider not found"),
@@ -0,0 +1,68 @@
+# /tests/test_concurrency.py
+
+import asyncio
+
+from llm_api.providers._concurrency import AdaptiveSemaphore
+
+
+class TestAdaptiveSemaphore:
+    """Tests for the AIMD adjustment of the adaptive concurrency limit."""
+
+    def test_failure_halves_limit(self):
+        sem = AdaptiveSemaphore(initial=8, max_limit=8)
+        sem.report(10, ok=False)
+        assert sem.limit == 4
+        sem.report(10, ok=False)
+        sem.report(10, ok=False)
+        sem.report(10, ok=False)
+        assert sem.limit == 1
+
+    def test_limit_grows_by_one_after_limit_successes(self):
+        sem = AdaptiveSemaphore(initial=2, max_limit=8)
+        sem.report(10, ok=True)
+        assert sem.limit == 2
+        sem.report(10, ok=True)
+        assert sem.limit == 3
+        for _ in range(3):
+            sem.report(10, ok=True)
+        assert sem.limit == 4
+
+    def test_failure_resets_success_streak(self):
+        sem = AdaptiveSemaphore(initial=4, max_limit=8)
+        for _ in range(3):
+            sem.report(10, ok=True)
+        sem.report(10, ok=False)
+        sem.report(10, ok=True)
+        assert sem.limit == 2
+
+    def test_never_exceeds_max_limit(self):
+        sem = AdaptiveSemaphore(initial=1, max_limit=3)
+        for _ in range(100):
+            sem.report(10, ok=True)
+        assert sem.limit == 3
+        assert AdaptiveSemaphore(initial=10, max_limit=3).limit == 3
+
+    def test_slow_responses_do_not_grow_limit(self):
+        sem = AdaptiveSemaphore(initial=1, max_limit=4, latency_threshold_ms=100)
+        for _ in range(10):
+            sem.report(500, ok=True)
+        assert sem.limit == 1
+
+    def test_in_flight_never_exceeds_limit(self):
+        sem = AdaptiveSemaphore(initial=2, max_limit=2)
+        in_flight = 0
+        peak = 0
+
+        async def worker():
+            nonlocal in_flight, peak
+            async with sem:
+                in_flight += 1
+                peak = max(peak, in_flight)
+                await asyncio.sleep(0)
+                in_flight -= 1
+
+        async def run():
+            await asyncio.gather(*(worker() for _ in range(10)))
+
+        asyncio.run(run())
+        assert peak == 2
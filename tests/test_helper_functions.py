@@ -0,0 +1,27 @@
+# /tests/test_helper_functions.py
+
+import pytest
+
+from llm_api.utils.helper_functions import get_model_family
+
+
+class TestGetModelFamily:
+    """Tests for model family detection and its keyword precedence."""
+
+    @pytest.mark.parametrize("model_name,expected", [
+        ("llama3:8b-instruct-q5_K_M", "llama"),
+        ("qwen2:7b", "qwen"),
+        ("gemma3:latest", "gemma"),
+        ("mixtral:8x7b", "mistral"),
+        ("phi3:mini", "phi"),
+        # 'dolphin' contains 'phi', but the mistral keyword takes precedence
+        ("dolphin-mistral:7b", "mistral"),
+        # llama is checked before qwen regardless of position in the name
+        ("qwen-llama-merge", "llama"),
+        ("llama-qwen-merge", "llama"),
+        ("QWEN2.5-Coder", "qwen"),
+        ("some-unknown-model", "unknown"),
+        ("", "unknown"),
+    ])
+    def test_family_precedence(self, model_name, expected):
+        assert get_model_family(model_name) == expected
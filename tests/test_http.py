@@ -0,0 +1,55 @@
+# /tests/test_http.py
+
+import asyncio
+
+import pytest
+
+from llm_api.utils import http
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_client(monkeypatch):
+    """Start every test without a shared client."""
+    monkeypatch.setattr(http, "_client", None)
+    monkeypatch.setattr(http, "_client_loop", None)
+
+
+class TestSharedClient:
+    """Tests for the process-wide httpx client and its per-event-loop lifecycle."""
+
+    def test_same_loop_reuses_client(self):
+        async def run():
+            return await http.get_client(), await http.get_client()
+
+        first, second = asyncio.run(run())
+        assert first is second
+        assert not first.is_closed
+
+    def test_new_loop_closes_previous_client(self):
+        first = asyncio.run(http.get_client())
+        second = asyncio.run(http.get_client())
+        assert first is not second
+        assert first.is_closed
+        assert not second.is_closed
+
+    def test_previous_client_with_dead_loop_transport_is_dropped(self):
+        """aclose() failing because the old loop is gone must not break get_client()."""
+        first = asyncio.run(http.get_client())
+
+        async def broken_aclose():
+            raise RuntimeError("Event loop is closed")
+
+        first.aclose = broken_aclose
+        second = asyncio.run(http.get_client())
+        assert second is not first
+        assert http._client is second
+
+    def test_close_client_resets_shared_client(self):
+        async def run():
+            client = await http.get_client()
+            await http.close_client()
+            return client
+
+        client = asyncio.run(run())
+        assert client.is_closed
+        assert http._client is None
@@ -0,0 +1,71 @@
+# /tests/test_json_mode.py
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+
+def _openai_response(text):
+    usage = SimpleNamespace(prompt_tokens=1, completion_tokens=1, total_tokens=2)
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))], model="m", usage=usage)
+
+
+class TestOpenAIJsonMode:
+    """Tests that json_mode is forwarded to the OpenAI chat completions API."""
+
+    @pytest.fixture
+    def provider(self):
+        pytest.importorskip("openai")
+        from llm_api.providers.openai import OpenAIProvider
+
+        provider = OpenAIProvider.__new__(OpenAIProvider)
+        provider.default_model = "m"
+        provider.requests = []
+
+        async def create(**params):
+            provider.requests.append(params)
+            return _openai_response("{}")
+
+        provider.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        return provider
+
+    def test_json_mode_sets_response_format(self, provider):
+        asyncio.run(provider.standard_call("hi", json_mode=True))
+        assert provider.requests[0]["response_format"] == {"type": "json_object"}
+
+    def test_plain_call_omits_response_format(self, provider):
+        asyncio.run(provider.standard_call("hi"))
+        assert "response_format" not in provider.requests[0]
+
+
+class TestGeminiJsonMode:
+    """Tests that json_mode is forwarded to Gemini as a JSON response MIME type."""
+
+    @pytest.fixture
+    def provider(self, monkeypatch):
+        pytest.importorskip("google.generativeai")
+        from llm_api.providers import gemini
+
+        provider = gemini.GeminiProvider.__new__(gemini.GeminiProvider)
+        provider.default_model = "m"
+        provider.requests = []
+
+        class FakeModel:
+            def __init__(self, name):
+                pass
+
+            async def generate_content_async(self, prompt, generation_config=None):
+                provider.requests.append(generation_config)
+                return SimpleNamespace(text="{}")
+
+        monkeypatch.setattr(gemini.genai, "GenerativeModel", FakeModel)
+        return provider
+
+    def test_json_mode_sets_response_mime_type(self, provider):
+        asyncio.run(provider.standard_call("hi", json_mode=True))
+        assert provider.requests == [{"response_mime_type": "application/json"}]
+
+    def test_plain_call_has_no_generation_config(self, provider):
+        asyncio.run(provider.standard_call("hi"))
+        assert provider.requests == [None]
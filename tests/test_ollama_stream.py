@@ -0,0 +1,106 @@
+# /tests/test_ollama_stream.py
+
+import asyncio
+
+import httpx
+import orjson
+import pytest
+
+from llm_api.providers import ollama
+from llm_api.providers.ollama import OllamaProvider
+
+
+def _ndjson(*chunks):
+    return b"\n".join(orjson.dumps(chunk) for chunk in chunks) + b"\n"
+
+
+@pytest.fixture
+def mock_ollama(monkeypatch):
+    """Route the provider's shared client to a MockTransport; call with (status, body) to set the reply."""
+    reply = {}
+
+    def handler(request):
+        return httpx.Response(reply["status"], content=reply["body"])
+
+    async def fake_get_client():
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    monkeypatch.setattr(ollama, "get_client", fake_get_client)
+
+    def configure(status, body):
+        reply.update(status=status, body=body)
+
+    return configure
+
+
+@pytest.fixture
+def provider():
+    provider = OllamaProvider()
+    provider.default_model = "test-model"
+    return provider
+
+
+class TestOllamaStream:
+    """Tests for assembling Ollama NDJSON streams into a standard response."""
+
+    def test_chunks_are_joined_with_usage_from_final_chunk(self, mock_ollama, provider):
+        mock_ollama(200, _ndjson(
+            {"message": {"content": "Hel"}, "done": False},
+            {"message": {"content": "lo"}, "done": False},
+            {"message": {"content": ""}, "done": True, "prompt_eval_count": 7, "eval_count": 3},
+        ))
+
+        response = asyncio.run(provider.standard_call("hi"))
+
+        assert response["error"] is None
+        assert response["text"] == "Hello"
+        assert response["model"] == "test-model"
+        assert response["usage"] == {"prompt_tokens": 7, "completion_tokens": 3, "total_tokens": 10}
+
+    def test_blank_lines_are_skipped(self, mock_ollama, provider):
+        mock_ollama(200, b'{"message": {"content": "a"}}\n\n{"message": {"content": "b"}, "done": true}\n')
+        assert asyncio.run(provider.standard_call("hi"))["text"] == "ab"
+
+    def test_inline_error_chunk_becomes_error_response(self, mock_ollama, provider):
+        mock_ollama(200, _ndjson(
+            {"message": {"content": "partial"}},
+            {"error": "model 'test-model' not found"},
+            {"message": {"content": "ignored"}, "done": True},
+        ))
+
+        response = asyncio.run(provider.standard_call("hi"))
+
+        assert response["text"] == ""
+        assert "model 'test-model' not found" in response["error"]
+
+
+class TestOllamaConcurrencyFeedback:
+    """Tests for the AIMD feedback reported by stream_call for each HTTP status class."""
+
+    def _consume(self, provider):
+        async def run():
+            return [chunk async for chunk in provider.stream_call("hi")]
+        return asyncio.run(run())
+
+    def test_success_is_reported_ok(self, mock_ollama, provider):
+        mock_ollama(200, _ndjson({"message": {"content": "x"}, "done": True}))
+        provider.sem.limit, provider.sem.max_limit = 1, 4
+        self._consume(provider)
+        assert provider.sem.limit == 2
+
+    @pytest.mark.parametrize("status", [500, 503, 429])
+    def test_overload_shrinks_limit(self, mock_ollama, provider, status):
+        mock_ollama(status, b'{"error": "busy"}')
+        provider.sem.limit, provider.sem.max_limit = 4, 4
+        with pytest.raises(httpx.HTTPStatusError):
+            self._consume(provider)
+        assert provider.sem.limit == 2
+
+    @pytest.mark.parametrize("status", [400, 404])
+    def test_client_error_is_neutral(self, mock_ollama, provider, status):
+        mock_ollama(status, b'{"error": "bad request"}')
+        provider.sem.limit, provider.sem.max_limit = 1, 4
+        with pytest.raises(httpx.HTTPStatusError):
+            self._consume(provider)
+        assert provider.sem.limit == 1
+        assert provider.sem._successes == 0
@@ -0,0 +1,118 @@
+# /tests/test_rag_query.py
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("langchain")
+pytest.importorskip("langchain_community")
+pytest.importorskip("langchain_huggingface")
+
+from llm_api.providers.base import ProviderCapability
+from llm_api.rag.manager import RAGManager, _heuristic_query
+
+
+class FakeProvider:
+    """Minimal provider returning queued response texts and recording each call's kwargs."""
+
+    def __init__(self, *texts, json_mode=True):
+        self._texts = list(texts)
+        self._json_mode = json_mode
+        self.calls = []
+
+    def get_capabilities(self):
+        return {ProviderCapability.JSON_MODE: self._json_mode}
+
+    async def call(self, prompt, system_prompt="", **kwargs):
+        self.calls.append(kwargs)
+        return {"text": self._texts.pop(0)}
+
+
+class TestHeuristicQuery:
+    """Tests for the LLM-free query used to prefetch Wikipedia."""
+
+    @pytest.mark.parametrize("prompt,expected", [
+        ("What is the difference between Llama.cpp and Ollama?", "Llama.cpp Ollama"),
+        ("ディープラーニングとは何ですか？", "ディープラーニング"),
+        ("Python and Python and Rust", "Python Rust"),
+        ("Alpha Beta Gamma Delta", "Alpha Beta Gamma"),
+        ("日本の首都はどこですか？", "日本 首都"),
+        ("どこですか？", ""),
+    ])
+    def test_extracts_proper_noun_candidates(self, prompt, expected):
+        assert _heuristic_query(prompt) == expected
+
+    @pytest.mark.parametrize("prompt,expected", [
+        ("最新のPythonについて教えて", "Python"),
+        ("OpenAIのGPT-4とは？", "OpenAI GPT-4"),
+        ("量子コンピュータとShorのアルゴリズム", "量子コンピュータ Shor アルゴリズム"),
+    ])
+    def test_mixed_japanese_and_latin_terms(self, prompt, expected):
+        assert _heuristic_query(prompt) == expected
+
+    @pytest.mark.parametrize("prompt,expected", [
+        ("Describe the Eiffel Tower", "Eiffel Tower"),
+        ("In Tokyo, what is Shibuya?", "Tokyo Shibuya"),
+    ])
+    def test_sentence_initial_words_are_ignored(self, prompt, expected):
+        assert _heuristic_query(prompt) == expected
+
+    @pytest.mark.parametrize("prompt,classified,prefetched", [
+        ("How does Llama.cpp compare to Ollama?", "ollama llama.cpp", "Llama.cpp Ollama"),
+        ("最新のPythonについて教えて", "Python", "Python"),
+        ("OpenAIのGPT-4とは？", "GPT-4 OpenAI", "OpenAI GPT-4"),
+    ])
+    def test_speculative_result_reused_when_queries_match(self, prompt, classified, prefetched):
+        provider = FakeProvider('{"search_query": "%s", "answer_uses_context": true}' % classified)
+        manager = RAGManager(provider=provider, use_wikipedia=True)
+        searched = []
+
+        async def fake_retrieve(query):
+            searched.append(query)
+            return "context"
+
+        manager._retrieve_from_wikipedia = fake_retrieve
+        augmented = asyncio.run(manager.retrieve_and_augment(prompt))
+
+        assert searched == [prefetched]
+        assert "context" in augmented
+
+
+class TestResolveSearchQuery:
+    """Tests for the JSON-mode classification and its fallback to plain query extraction."""
+
+    def _resolve(self, provider, prompt="Llama.cppとは？"):
+        return asyncio.run(RAGManager(provider=provider)._resolve_search_query(prompt))
+
+    def test_json_query_is_used(self):
+        provider = FakeProvider('{"search_query": "「Llama.cpp」", "answer_uses_context": true}')
+        assert self._resolve(provider) == "Llama.cpp"
+        assert provider.calls == [{"json_mode": True}]
+
+    @pytest.mark.parametrize("flag", ["false", '"false"', '"False"', '" FALSE "'])
+    def test_no_context_needed_returns_none(self, flag):
+        provider = FakeProvider('{"search_query": "x", "answer_uses_context": %s}' % flag)
+        assert self._resolve(provider) is None
+        assert len(provider.calls) == 1
+
+    @pytest.mark.parametrize("flag", ['"true"', '"TRUE"', "null", "1"])
+    def test_truthy_or_unknown_flag_keeps_context(self, flag):
+        provider = FakeProvider('{"search_query": "Llama.cpp", "answer_uses_context": %s}' % flag)
+        assert self._resolve(provider) == "Llama.cpp"
+
+    @pytest.mark.parametrize("reply", [
+        "Llama.cpp",
+        '{"search_query": ',
+        '結果: {"search_query": "Llama.cpp", "answer_uses_context": true} 以上',
+        '["Llama.cpp"]',
+        '{"search_query": "", "answer_uses_context": true}',
+    ], ids=["not_json", "truncated_json", "json_in_prose", "not_an_object", "empty_query"])
+    def test_falls_back_to_plain_extraction(self, reply):
+        provider = FakeProvider(reply, "出力：「Llama.cpp」")
+        assert self._resolve(provider) == "Llama.cpp"
+        assert provider.calls == [{"json_mode": True}, {}]
+
+    def test_provider_without_json_mode_skips_classification(self):
+        provider = FakeProvider("Llama.cpp", json_mode=False)
+        assert self._resolve(provider) == "Llama.cpp"
+        assert provider.calls == [{}]
@@ -0,0 +1,158 @@
+# /tests/test_ratelimit.py
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import httpx
+import pytest
+
+from llm_api.utils import ratelimit
+from llm_api.utils.ratelimit import TokenBucket, call_with_rate_limit, parse_retry_after
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    """Replace the limiter's clock and sleep with a virtual clock; yields the list of requested sleeps."""
+    now = [1000.0]
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+        now[0] += delay
+
+    monkeypatch.setattr(ratelimit.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(ratelimit.asyncio, "sleep", fake_sleep)
+    yield sleeps
+
+
+def _http_429(retry_after=None):
+    headers = {"Retry-After": retry_after} if retry_after is not None else {}
+    request = httpx.Request("POST", "http://test/api")
+    response = httpx.Response(429, headers=headers, request=request)
+    return httpx.HTTPStatusError("Too Many Requests", request=request, response=response)
+
+
+class TestTokenBucket:
+    """Tests for RPM/TPM pacing of the token bucket."""
+
+    def test_rpm_paces_requests_after_burst(self, fake_clock):
+        """A full bucket admits `rpm` requests at once, then waits 60/rpm seconds per request."""
+        bucket = TokenBucket(rpm=2)
+
+        async def run():
+            for _ in range(3):
+                await bucket.acquire()
+
+        asyncio.run(run())
+        assert fake_clock == [pytest.approx(30.0)]
+
+    def test_tpm_waits_for_token_refill(self, fake_clock):
+        bucket = TokenBucket(tpm=600)
+
+        async def run():
+            await bucket.acquire(est_tokens=600)
+            await bucket.acquire(est_tokens=100)
+
+        asyncio.run(run())
+        assert fake_clock == [pytest.approx(10.0)]
+
+    def test_tpm_cost_clamped_to_capacity(self, fake_clock):
+        """A request larger than the whole TPM budget waits for a full bucket instead of forever."""
+        bucket = TokenBucket(tpm=100)
+
+        async def run():
+            await bucket.acquire(est_tokens=500)
+            await bucket.acquire(est_tokens=500)
+
+        asyncio.run(run())
+        assert fake_clock == [pytest.approx(60.0)]
+
+    def test_unlimited_dimensions_never_wait(self, fake_clock):
+        bucket = TokenBucket()
+
+        async def run():
+            for _ in range(100):
+                await bucket.acquire(est_tokens=10_000)
+
+        asyncio.run(run())
+        assert fake_clock == []
+
+
+class TestParseRetryAfter:
+    """Tests for Retry-After header parsing."""
+
+    @pytest.mark.parametrize("value,expected", [
+        ("5", 5.0),
+        ("0.5", 0.5),
+        ("-3", 0.0),
+    ])
+    def test_delta_seconds(self, value, expected):
+        assert parse_retry_after(value) == expected
+
+    def test_http_date(self):
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+        delay = parse_retry_after(format_datetime(retry_at, usegmt=True))
+        assert 25.0 <= delay <= 30.0
+
+    def test_http_date_in_past_is_zero(self):
+        assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+    @pytest.mark.parametrize("value", [None, "", "soon", "12 parsecs"])
+    def test_missing_or_garbage_uses_default(self, value):
+        assert parse_retry_after(value, default=2.5) == 2.5
+
+
+class TestCallWithRateLimit:
+    """Tests for the single 429 retry performed by call_with_rate_limit."""
+
+    def test_retries_once_after_429(self, fake_clock):
+        calls = []
+
+        async def func():
+            calls.append(1)
+            if len(calls) == 1:
+                raise _http_429("3")
+            return "ok"
+
+        assert asyncio.run(call_with_rate_limit(None, 0, func)) == "ok"
+        assert len(calls) == 2
+        assert fake_clock == [3.0]
+
+    def test_second_429_is_raised(self, fake_clock):
+        calls = []
+
+        async def func():
+            calls.append(1)
+            raise _http_429()
+
+        with pytest.raises(httpx.HTTPStatusError):
+            asyncio.run(call_with_rate_limit(None, 0, func))
+        assert len(calls) == 2
+
+    def test_other_status_errors_are_not_retried(self, fake_clock):
+        calls = []
+
+        async def func():
+            calls.append(1)
+            request = httpx.Request("POST", "http://test/api")
+            raise httpx.HTTPStatusError("boom", request=request, response=httpx.Response(500, request=request))
+
+        with pytest.raises(httpx.HTTPStatusError):
+            asyncio.run(call_with_rate_limit(None, 0, func))
+        assert calls == [1]
+        assert fake_clock == []
+
+    def test_retry_reacquires_bucket(self, fake_clock):
+        bucket = TokenBucket(rpm=1)
+        calls = []
+
+        async def func():
+            calls.append(1)
+            if len(calls) == 1:
+                raise _http_429("0")
+            return "ok"
+
+        assert asyncio.run(call_with_rate_limit(bucket, 0, func)) == "ok"
+        # Retry-After of 0, then a full minute for the single-request bucket to refill
+        assert fake_clock == [0.0, pytest.approx(60.0)]